@@ -3,10 +3,45 @@ Overphloem: Framework for writing Overleaf bots.
 
 This package provides tools to sync, monitor, and automate operations on Overleaf projects.
 """
+from typing import TYPE_CHECKING, Any
 
-from overphloem.core.project import Project
-from overphloem.core.events import Event, on
-from overphloem.core.file import File
+if TYPE_CHECKING:
+    from overphloem.core.project import Project
+    from overphloem.core.events import Event, on
+    from overphloem.core.file import File
 
 __version__ = "0.1.0"
-__all__ = ["Project", "Event", "on", "File"]
\ No newline at end of file
+__all__ = ["Project", "Event", "on", "File"]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import public names lazily (PEP 562), so that the CLI and submodules can
+    be imported without loading the whole core package.
+
+    Args:
+        name (str): Attribute name.
+
+    Returns:
+        Any: The requested attribute.
+
+    Raises:
+        AttributeError: If name is not exported by this package.
+    """
+    if name in __all__:
+        import overphloem.core
+
+        value = getattr(overphloem.core, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    """
+    List module attributes, including the lazily imported ones.
+
+    Returns:
+        list: Attribute names.
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -3,13 +3,50 @@ Command-line interface for overphloem.
 """
 
 import argparse
+import hashlib
 import os
 import sys
 import subprocess
 from pathlib import Path
-from typing import Optional, List, Any
+from stat import S_ISREG
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    List,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+)
+
+from overphloem.core.backoff import AdaptiveInterval
+from overphloem.core.debounce import ADDED, DELETED, MODIFIED, Debouncer
+
+# Heavier modules are imported inside the commands that use them, so that
+# e.g. `overphloem --help` does not pay for them
+if TYPE_CHECKING:
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from overphloem.core.project import Project
+
+# Filesystems on which OS change notifications cannot be relied upon
+_NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "sshfs", "9p", "afs"}
+
+# ANSI colors for diff lines, keyed by their first character
+_DIFF_COLORS = {
+    "+": "\033[92m",  # Green for additions
+    "-": "\033[91m",  # Red for deletions
+    "@": "\033[94m",  # Blue for section headers
+}
+_RESET = "\033[0m"
 
-from overphloem.core.project import Project
+# Number of files whose previous text is kept for verbose diffs
+_DIFF_CACHE_SIZE = 64
+
+# Shared pool for reading changed files, created on first use
+_read_pool: Optional["ThreadPoolExecutor"] = None
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -28,11 +65,13 @@ def create_parser() -> argparse.ArgumentParser:
     pull_parser = subparsers.add_parser("pull", help="Pull from Overleaf project")
     pull_parser.add_argument("--project-id", required=True, help="Overleaf project ID")
     pull_parser.add_argument("--path", default="", help="Local directory to pull to")
+    pull_parser.set_defaults(func=pull_command)
 
     # Push command
     push_parser = subparsers.add_parser("push", help="Push to Overleaf project")
     push_parser.add_argument("--project-id", required=True, help="Overleaf project ID")
     push_parser.add_argument("--path", default=".", help="Local directory to push from")
+    push_parser.set_defaults(func=push_command)
 
     # Attach command
     attach_parser = subparsers.add_parser(
@@ -62,6 +101,7 @@ def create_parser() -> argparse.ArgumentParser:
     attach_parser.add_argument(
         "--push", action="store_true", help="Push changes after script execution"
     )
+    attach_parser.set_defaults(func=attach_command)
 
     # Listen command
     listen_parser = subparsers.add_parser(
@@ -85,6 +125,7 @@ def create_parser() -> argparse.ArgumentParser:
     listen_parser.add_argument(
         "--verbose", "-v", action="store_true", help="Show detailed change information"
     )
+    listen_parser.set_defaults(func=listen_command)
 
     return parser
 
@@ -99,6 +140,8 @@ def pull_command(args: argparse.Namespace) -> int:
     Returns:
         int: Exit code.
     """
+    from overphloem.core.project import Project
+
     project = Project(args.project_id, args.path)
     success = project.pull()
 
@@ -120,6 +163,8 @@ def push_command(args: argparse.Namespace) -> int:
     Returns:
         int: Exit code.
     """
+    from overphloem.core.project import Project
+
     project = Project(args.project_id, args.path)
     success = project.push()
 
@@ -143,95 +188,128 @@ def attach_command(args: argparse.Namespace) -> int:
     Returns:
         int: Exit code.
     """
-    import time
     import threading
     from overphloem.core.events import Event
+    from overphloem.core.project import Project
 
-    event_type = Event(args.on)
-    project = Project(args.project_id)
     script_path = Path(args.script).absolute()
 
     if not script_path.exists():
         print(f"Script {args.script} does not exist")
         return 1
 
-    def callback(project: Project) -> bool:
+    event_type = Event(args.on)
+    # Reuse the same checkout across runs instead of cloning into a new
+    # temporary directory every time
+    project = Project(args.project_id, _cache_path(args.project_id))
+
+    def callback(project: Project, changes: Optional[Dict[str, str]] = None) -> bool:
         """Execute script and return whether to push changes."""
+        env = None
+        if changes is not None:
+            # Expose the merged batch to the script as "<type>\t<path>" lines
+            env = dict(os.environ)
+            env["OVERPHLOEM_CHANGES"] = "\n".join(
+                f"{event}\t{path}" for path, event in sorted(changes.items())
+            )
+
         try:
-            subprocess.run([str(script_path)], cwd=project.local_path, check=True)
+            subprocess.run(
+                [str(script_path)], cwd=project.local_path, env=env, check=True
+            )
             return True
         except subprocess.CalledProcessError:
             return False
 
+    # Pull once up front so the first check compares against a real state
+    if not project.pull():
+        print(f"Failed to pull project {args.project_id}")
+        return 1
+    last_hash = _get_commit_hash(project)
+    file_states = _snapshot_files(project.local_path)
+
     # Start monitoring for changes
     stop_event = threading.Event()
 
     def monitor_changes() -> None:
         """Monitor for changes to the project."""
+        nonlocal last_hash, file_states
         print(f"Monitoring project {args.project_id} for {args.on} events...")
         print(f"Press Ctrl+C to stop")
 
-        last_hash = None
-        interval = args.interval
+        backoff = AdaptiveInterval(args.interval, falloff=args.falloff)
+        debouncer = Debouncer()
 
-        while not stop_event.is_set():
+        while not backoff.sleep(stop_event):
             try:
                 project.pull()
                 current_hash = _get_commit_hash(project)
+                changed = current_hash != last_hash
 
-                if current_hash != last_hash and last_hash is not None:
+                if changed:
                     print(f"Change detected in project {args.project_id}")
-                    should_push = callback(project)
+
+                    # Keep pulling while changes are still arriving, so a
+                    # burst of edits runs the script once
+                    while True:
+                        new_states = _snapshot_files(project.local_path, file_states)
+                        debouncer.push_many(_diff_snapshots(file_states, new_states))
+                        file_states = new_states
+
+                        if stop_event.wait(debouncer.window_ms / 1000):
+                            break
+                        project.pull()
+                        next_hash = _get_commit_hash(project)
+                        if next_hash == current_hash:
+                            break
+                        current_hash = next_hash
+
+                    should_push = callback(project, changes=debouncer.flush(stop_event))
 
                     if should_push and args.push:
+                        # The script may have changed any file
+                        project.mark_dirty()
                         project.push()
                         print(f"Pushed changes to project {args.project_id}")
 
-                    # Reset interval after successful event
-                    interval = args.interval
-                elif args.falloff is not None:
-                    # Apply falloff to increase wait time
-                    interval = min(
-                        interval * args.falloff, 3600  # Max interval: 1 hour
-                    )
+                    # Take in the script's own writes, so they are not
+                    # reported back to it as the next batch of changes
+                    file_states = _snapshot_files(project.local_path, file_states)
 
+                # Reset interval after an event, back off otherwise
+                backoff.tick(changed)
                 last_hash = current_hash
-                time.sleep(interval)
             except Exception as e:
                 print(f"Error: {e}")
-                time.sleep(interval)
 
     thread = threading.Thread(target=monitor_changes)
     thread.daemon = True
     thread.start()
 
-    try:
-        # Keep main thread alive
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Stopping monitoring...")
-        stop_event.set()
-        thread.join(timeout=5)
-        return 0
+    _wait_for_interrupt(stop_event, [thread])
+    return 0
 
 
 def listen_command(args: argparse.Namespace) -> int:
     """
     Execute listen command to monitor and print changes in an Overleaf project.
 
+    Local changes are picked up through OS file notifications when
+    ``watchfiles`` is available and the project is not on a network
+    filesystem; otherwise the working copy is re-scanned after every pull.
+
     Args:
         args (argparse.Namespace): Command-line arguments.
 
     Returns:
         int: Exit code.
     """
-    import time
     import threading
     import datetime
-    import subprocess
-    import difflib
-    from overphloem.core.events import Event
+    from collections import OrderedDict
+    from overphloem.core.index import FileIndex
+    from overphloem.core.project import Project
+    from overphloem.utils.utils import walk_files
 
     project = Project(args.project_id, args.path)
 
@@ -245,172 +323,529 @@ def listen_command(args: argparse.Namespace) -> int:
         print(f"Failed to pull project {args.project_id}")
         return 1
 
+    try:
+        import watchfiles
+    except ImportError:
+        watchfiles = None
+
+    use_watcher = watchfiles is not None and not _is_network_fs(project.local_path)
+
     print(f"Successfully initialized project {args.project_id}")
-    print(f"Monitoring for changes every {args.interval} seconds...")
+    if use_watcher:
+        print(
+            f"Watching {project.local_path} for changes, "
+            f"pulling every {args.interval} seconds..."
+        )
+    else:
+        print(f"Monitoring for changes every {args.interval} seconds...")
     print("Press Ctrl+C to stop")
 
-    # Track file states to detect changes
-    file_states = {}
-
-    # Store initial file states
-    for file in project.files:
-        if file.path.is_file():
+    # Track (mtime_ns, size, digest) per file to detect changes, on disk so
+    # memory stays flat and a restart can reuse the digests
+    file_states = FileIndex.for_project(project)
+
+    # Previous lines of recently seen files, used for diffs in verbose mode.
+    # Lines are stored pre-split so a diff does not split the old text again.
+    previous_lines = OrderedDict()
+
+    def remember_lines(rel_path: str, lines: Tuple[str, ...]) -> None:
+        """Keep the latest lines of a file, evicting the least recently used."""
+        previous_lines[rel_path] = lines
+        previous_lines.move_to_end(rel_path)
+        if len(previous_lines) > _DIFF_CACHE_SIZE:
+            previous_lines.popitem(last=False)
+
+    def scan_project() -> Iterator[Any]:
+        """Yield (rel_path, path, stat) for every file in the working copy."""
+        for entry in walk_files(project.local_path):
+            rel_path = os.path.relpath(entry.path, project.local_path)
+            try:
+                yield rel_path, entry.path, entry.stat()
+            except OSError as e:
+                print(f"Warning: Could not read file {rel_path}: {e}")
+
+    def update_files(
+        candidates: Iterable[Any],
+        changed_files: List[Any],
+        new_files: List[str],
+    ) -> None:
+        """Re-hash files whose metadata changed and record how they changed."""
+        stale = []
+        updated = []
+        for rel_path, path, stat in candidates:
+            state = file_states.get(rel_path)
+            if state is None or state[:2] != (stat.st_mtime_ns, stat.st_size):
+                stale.append((rel_path, path, stat, state))
+
+        # Keep many reads in flight at once rather than reading one by one.
+        # Diffs need the contents, so verbose mode reads each file once and
+        # hashes that buffer instead of streaming the file into the hash.
+        read = _read_with_digest if args.verbose else _file_digest
+        pool = _get_read_pool()
+        futures = [pool.submit(read, path) for _, path, _, _ in stale]
+
+        for (rel_path, path, stat, state), future in zip(stale, futures):
             try:
-                with open(file.path, "r", encoding="utf-8", errors="replace") as f:
-                    file_states[str(file.relative_path)] = f.read()
+                if args.verbose:
+                    data, digest = future.result()
+                else:
+                    data, digest = None, future.result()
             except Exception as e:
-                print(f"Warning: Could not read file {file.relative_path}: {e}")
+                print(f"Warning: Could not read file {rel_path}: {e}")
+                continue
+
+            updated.append((rel_path, (stat.st_mtime_ns, stat.st_size, digest)))
+
+            if state is not None and state[2] == digest:
+                continue
+
+            # Only decode changed text files, which need a diff
+            current_lines = None
+            if data is not None and not _is_binary(data):
+                current_lines = tuple(
+                    data.decode("utf-8", errors="replace").splitlines()
+                )
+
+            if state is None:
+                new_files.append(rel_path)
+            else:
+                changed_files.append(
+                    (rel_path, previous_lines.pop(rel_path, None), current_lines)
+                )
+
+            if current_lines is not None:
+                remember_lines(rel_path, current_lines)
+
+        file_states.update(updated)
+
+    # Store initial file states, dropping files removed since the last run
+    candidates = list(scan_project())
+    update_files(candidates, [], [])
+    file_states.remove(file_states.keys() - {rel_path for rel_path, _, _ in candidates})
 
     last_hash = _get_commit_hash(project)
-    current_interval = args.interval
+    backoff = AdaptiveInterval(args.interval, falloff=args.falloff)
 
     # Start monitoring thread
     stop_event = threading.Event()
 
+    # The pull and watch threads share the project's cached repository
+    # handle, which is not safe to use from two threads at once
+    git_lock = threading.Lock()
+
+    def report_changes(
+        commit_hash: str,
+        changed_files: List[Any],
+        new_files: List[str],
+        deleted_files: List[str],
+    ) -> None:
+        """Print a summary of detected changes to the console."""
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"\n[{timestamp}] Changes detected in project {args.project_id}")
+        print(f"Commit hash: {commit_hash}")
+
+        # Print summary of changes
+        if changed_files:
+            print(f"\nModified files ({len(changed_files)}):")
+            for path, old_lines, new_lines in changed_files:
+                print(f"  - {path}")
+
+                # Show diff in verbose mode
+                if not args.verbose:
+                    continue
+                if new_lines is None:
+                    print("    Binary file changed")
+                elif old_lines is not None:
+                    _print_diff(old_lines, new_lines)
+
+        if new_files:
+            print(f"\nNew files ({len(new_files)}):")
+            for path in new_files:
+                print(f"  + {path}")
+
+        if deleted_files:
+            print(f"\nDeleted files ({len(deleted_files)}):")
+            for path in deleted_files:
+                print(f"  - {path}")
+
+        if not (changed_files or new_files or deleted_files):
+            print("  No file changes detected (metadata or history change only)")
+
+        print("\n" + "-" * 60)
+
     def monitor_changes() -> None:
         """Monitor project for changes and print them to console."""
-        nonlocal last_hash, current_interval, file_states
-
-        while not stop_event.is_set():
-            time.sleep(current_interval)
-            if stop_event.is_set():
-                break
+        nonlocal last_hash
 
+        while not backoff.sleep(stop_event):
             try:
                 # Pull the latest changes
                 project.pull()
                 current_hash = _get_commit_hash(project)
 
                 # Only process if the commit hash changed
-                if current_hash != last_hash and last_hash is not None:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    print(
-                        f"\n[{timestamp}] Changes detected in project {args.project_id}"
-                    )
-                    print(f"Commit hash: {current_hash}")
+                changed = current_hash != last_hash
 
+                if changed:
                     # Track changed files
                     changed_files = []
                     new_files = []
-                    deleted_files = []
 
                     # Check for modified and new files
-                    for file in project.files:
-                        if file.path.is_file():
-                            rel_path = str(file.relative_path)
-                            try:
-                                with open(
-                                    file.path, "r", encoding="utf-8", errors="replace"
-                                ) as f:
-                                    current_content = f.read()
-
-                                if rel_path in file_states:
-                                    # Check if file was modified
-                                    if current_content != file_states[rel_path]:
-                                        changed_files.append(
-                                            (
-                                                rel_path,
-                                                file_states[rel_path],
-                                                current_content,
-                                            )
-                                        )
-                                        file_states[rel_path] = current_content
-                                else:
-                                    # New file
-                                    new_files.append(rel_path)
-                                    file_states[rel_path] = current_content
-                            except Exception as e:
-                                print(f"Warning: Could not read file {rel_path}: {e}")
-
-                    # Check for deleted files
-                    for path in list(file_states.keys()):
-                        if not (project.local_path / path).exists():
-                            deleted_files.append(path)
-                            del file_states[path]
-
-                    # Print summary of changes
-                    if changed_files:
-                        print(f"\nModified files ({len(changed_files)}):")
-                        for path, old_content, new_content in changed_files:
-                            print(f"  - {path}")
-
-                            # Show diff in verbose mode
-                            if args.verbose:
-                                diff = difflib.unified_diff(
-                                    old_content.splitlines(),
-                                    new_content.splitlines(),
-                                    lineterm="",
-                                    n=3,  # Context lines
-                                )
-
-                                diff_text = "\n".join(
-                                    list(diff)[2:]
-                                )  # Skip the file path lines
-                                if diff_text:
-                                    for line in diff_text.splitlines():
-                                        if line.startswith("+"):
-                                            print(
-                                                f"    \033[92m{line}\033[0m"
-                                            )  # Green for additions
-                                        elif line.startswith("-"):
-                                            print(
-                                                f"    \033[91m{line}\033[0m"
-                                            )  # Red for deletions
-                                        elif line.startswith("@@"):
-                                            print(
-                                                f"    \033[94m{line}\033[0m"
-                                            )  # Blue for section headers
-                                        else:
-                                            print(f"    {line}")
-                                    print()
-
-                    if new_files:
-                        print(f"\nNew files ({len(new_files)}):")
-                        for path in new_files:
-                            print(f"  + {path}")
-
-                    if deleted_files:
-                        print(f"\nDeleted files ({len(deleted_files)}):")
-                        for path in deleted_files:
-                            print(f"  - {path}")
-
-                    if not (changed_files or new_files or deleted_files):
-                        print(
-                            "  No file changes detected (metadata or history change only)"
-                        )
-
-                    print("\n" + "-" * 60)
-
-                    # Reset interval after detecting changes
-                    current_interval = args.interval
-                elif args.falloff is not None:
-                    # Apply falloff to increase wait time when no changes
-                    current_interval = min(
-                        current_interval * args.falloff, 3600  # Max interval: 1 hour
+                    candidates = list(scan_project())
+                    update_files(candidates, changed_files, new_files)
+
+                    # Check for deleted files against the paths just walked
+                    current_paths = {rel_path for rel_path, _, _ in candidates}
+                    deleted_files = sorted(file_states.keys() - current_paths)
+                    file_states.remove(deleted_files)
+                    for path in deleted_files:
+                        previous_lines.pop(path, None)
+
+                    report_changes(
+                        current_hash, changed_files, new_files, deleted_files
                     )
 
+                # Reset interval after detecting changes, back off otherwise
+                backoff.tick(changed)
                 last_hash = current_hash
 
             except Exception as e:
                 print(f"Error monitoring changes: {e}")
-                time.sleep(args.interval)
 
-    thread = threading.Thread(target=monitor_changes)
-    thread.daemon = True
-    thread.start()
+    def pull_changes() -> None:
+        """Periodically pull the remote project; the watcher reports the results."""
+        nonlocal last_hash
+
+        while not backoff.sleep(stop_event):
+            try:
+                with git_lock:
+                    project.pull()
+                    current_hash = _get_commit_hash(project)
+
+                # Reset interval after detecting changes, back off otherwise
+                backoff.tick(current_hash != last_hash)
+                last_hash = current_hash
+            except Exception as e:
+                print(f"Error pulling changes: {e}")
+
+    def watch_changes() -> None:
+        """Print changes reported by filesystem notifications as they arrive."""
+        root = project.local_path.resolve()
+
+        for changes in watchfiles.watch(
+            root, stop_event=stop_event, rust_timeout=1000
+        ):
+            try:
+                changed_files = []
+                new_files = []
+                deleted_files = []
+                candidates = []
+
+                # A pull may report several events for one path (e.g. delete
+                # then add when git replaces a file), so classify by the final
+                # state.
+                for path in sorted({path for _, path in changes}):
+                    rel_path = os.path.relpath(path, root)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        stat = None
+
+                    if stat is None or not S_ISREG(stat.st_mode):
+                        if rel_path in file_states:
+                            deleted_files.append(rel_path)
+                            del file_states[rel_path]
+                            previous_lines.pop(rel_path, None)
+                        continue
+
+                    candidates.append((rel_path, path, stat))
+
+                update_files(candidates, changed_files, new_files)
+
+                if changed_files or new_files or deleted_files:
+                    with git_lock:
+                        commit_hash = _get_commit_hash(project)
+                    report_changes(
+                        commit_hash, changed_files, new_files, deleted_files
+                    )
+            except Exception as e:
+                print(f"Error monitoring changes: {e}")
+
+    if use_watcher:
+        threads = [
+            threading.Thread(target=pull_changes),
+            threading.Thread(target=watch_changes),
+        ]
+    else:
+        threads = [threading.Thread(target=monitor_changes)]
+
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    _wait_for_interrupt(stop_event, threads)
+    file_states.close()
+    return 0
 
+
+def _wait_for_interrupt(
+    stop_event: "threading.Event", threads: List["threading.Thread"]
+) -> None:
+    """
+    Block until Ctrl+C, then stop the worker threads.
+
+    Args:
+        stop_event (threading.Event): Event the workers stop on.
+        threads (List[threading.Thread]): Worker threads to wait for.
+    """
     try:
-        # Keep main thread alive
-        while True:
-            time.sleep(1)
+        # Block until interrupted; nothing else sets the event
+        stop_event.wait()
     except KeyboardInterrupt:
         print("\nStopping monitoring...")
+    finally:
         stop_event.set()
-        thread.join(timeout=5)
-        return 0
+        for thread in threads:
+            thread.join(timeout=5)
+
+
+def _print_diff(old_lines: Sequence[str], new_lines: Sequence[str]) -> None:
+    """
+    Print a unified diff of two file versions with a single write.
+
+    Lines are colored only when stdout is a terminal.
 
+    Args:
+        old_lines (Sequence[str]): Lines of the previous file content.
+        new_lines (Sequence[str]): Lines of the current file content.
+    """
+    import difflib
+    import io
+    from itertools import islice
+
+    diff = difflib.unified_diff(
+        old_lines,
+        new_lines,
+        lineterm="",
+        n=3,  # Context lines
+    )
+
+    colors = _DIFF_COLORS if sys.stdout.isatty() else {}
+    buf = io.StringIO()
+    for line in islice(diff, 2, None):  # Skip the file path lines
+        color = colors.get(line[:1])
+        buf.write("    ")
+        if color:
+            buf.write(color)
+            buf.write(line)
+            buf.write(_RESET)
+        else:
+            buf.write(line)
+        buf.write("\n")
+
+    if buf.tell():
+        buf.write("\n")
+        sys.stdout.write(buf.getvalue())
+
+
+def _file_digest(path: str) -> bytes:
+    """
+    Compute the digest used to detect file content changes.
+
+    The file is streamed into the hash rather than read into memory first,
+    and hashing releases the GIL, so digests computed on the read pool run
+    in parallel.
 
-def _get_commit_hash(project: Project) -> str:
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        bytes: 16-byte BLAKE2b digest of the file contents.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, _new_hash).digest()
+
+
+def _read_with_digest(path: str) -> Tuple[bytes, bytes]:
+    """
+    Read a file and compute its digest from the same buffer.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        Tuple[bytes, bytes]: The file contents and their 16-byte BLAKE2b digest.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return data, _new_hash(data).digest()
+
+
+def _new_hash(data: bytes = b"") -> Any:
+    """
+    Create the hash object used for file digests.
+
+    Args:
+        data (bytes, optional): Initial data to hash. Defaults to b"".
+
+    Returns:
+        Any: A 16-byte BLAKE2b hash object.
+    """
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def _cache_path(project_id: str) -> Path:
+    """
+    Get the persistent local checkout path for a project.
+
+    Args:
+        project_id (str): Overleaf project ID.
+
+    Returns:
+        Path: Directory under ``$XDG_CACHE_HOME/overphloem`` (or
+        ``~/.cache/overphloem``) named after the project.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "overphloem" / project_id
+
+
+def _snapshot_files(
+    root: Path, previous: Optional[Dict[str, Tuple[int, int, bytes]]] = None
+) -> Dict[str, Tuple[int, int, bytes]]:
+    """
+    Record (mtime_ns, size, digest) for every file in a project.
+
+    Files whose mtime and size match ``previous`` keep their old digest
+    without being read again.
+
+    Args:
+        root (Path): Project directory.
+        previous (Optional[Dict[str, Tuple[int, int, bytes]]]): Earlier
+            snapshot to reuse digests from.
+
+    Returns:
+        Dict[str, Tuple[int, int, bytes]]: Snapshot keyed by relative path.
+    """
+    from overphloem.utils.utils import walk_files
+
+    previous = previous or {}
+    states = {}
+    stale = []
+
+    for entry in walk_files(root):
+        rel_path = os.path.relpath(entry.path, root)
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+
+        state = previous.get(rel_path)
+        if state is not None and state[:2] == (stat.st_mtime_ns, stat.st_size):
+            states[rel_path] = state
+        else:
+            stale.append((rel_path, entry.path, stat))
+
+    pool = _get_read_pool()
+    futures = [pool.submit(_file_digest, path) for _, path, _ in stale]
+    for (rel_path, _, stat), future in zip(stale, futures):
+        try:
+            digest = future.result()
+        except OSError:
+            continue
+        states[rel_path] = (stat.st_mtime_ns, stat.st_size, digest)
+
+    return states
+
+
+def _diff_snapshots(
+    old: Dict[str, Tuple[int, int, bytes]], new: Dict[str, Tuple[int, int, bytes]]
+) -> List[Tuple[str, str]]:
+    """
+    Compare two snapshots taken by _snapshot_files.
+
+    Args:
+        old (Dict[str, Tuple[int, int, bytes]]): Earlier snapshot.
+        new (Dict[str, Tuple[int, int, bytes]]): Later snapshot.
+
+    Returns:
+        List[Tuple[str, str]]: ``(event_type, path)`` pairs.
+    """
+    events = [(DELETED, path) for path in old.keys() - new.keys()]
+    for path, state in new.items():
+        old_state = old.get(path)
+        if old_state is None:
+            events.append((ADDED, path))
+        elif old_state[2] != state[2]:
+            events.append((MODIFIED, path))
+    return events
+
+
+def _get_read_pool() -> "ThreadPoolExecutor":
+    """
+    Get the shared thread pool used to read files concurrently.
+
+    Returns:
+        ThreadPoolExecutor: The pool, created on first call.
+    """
+    global _read_pool
+    if _read_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _read_pool = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4),
+            thread_name_prefix="overphloem-read",
+        )
+    return _read_pool
+
+
+def _is_binary(data: bytes) -> bool:
+    """
+    Guess whether file contents are binary, using git's NUL-byte heuristic.
+
+    Args:
+        data (bytes): File contents.
+
+    Returns:
+        bool: True if the contents look binary, False otherwise.
+    """
+    return b"\0" in data[:8000]
+
+
+def _is_network_fs(path: Path) -> bool:
+    """
+    Check whether a path lives on a network filesystem.
+
+    Change notifications are unreliable on NFS/CIFS mounts, so callers fall
+    back to polling there.
+
+    Args:
+        path (Path): Path to check.
+
+    Returns:
+        bool: True if the path is on a network filesystem, False otherwise
+            (including when the mount table cannot be read).
+    """
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+
+    resolved = str(Path(path).resolve())
+    best_mount, best_type = "", ""
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if resolved == mount_point or resolved.startswith(
+            mount_point.rstrip("/") + "/"
+        ):
+            if len(mount_point) > len(best_mount):
+                best_mount, best_type = mount_point, fs_type
+
+    return best_type.split(".")[-1] in _NETWORK_FS_TYPES
+
+
+def _get_commit_hash(project: "Project") -> str:
     """
     Get the latest commit hash for a project.
 
@@ -420,17 +855,9 @@ def _get_commit_hash(project: Project) -> str:
     Returns:
         str: The latest commit hash, or empty string on error.
     """
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=project.local_path,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return ""
+    from overphloem.core.git import head_commit
+
+    return head_commit(project.local_path)
 
 
 def main() -> int:
@@ -443,17 +870,12 @@ def main() -> int:
     parser = create_parser()
     args = parser.parse_args()
 
-    if args.command == "pull":
-        return pull_command(args)
-    elif args.command == "push":
-        return push_command(args)
-    elif args.command == "attach":
-        return attach_command(args)
-    elif args.command == "listen":
-        return listen_command(args)
-    else:
+    # Each sub-command sets its handler as a default; none is set without one
+    func = getattr(args, "func", None)
+    if func is None:
         parser.print_help()
         return 1
+    return func(args)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,54 @@
 """
 Core package initialization.
+
+Submodules are imported on first attribute access, so importing a single
+module such as ``overphloem.core.backoff`` does not load the rest.
 """
-from overphloem.core.project import Project
-from overphloem.core.file import File
-from overphloem.core.events import Event, on
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from overphloem.core.project import Project
+    from overphloem.core.file import File
+    from overphloem.core.events import Event, on
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "Project": "overphloem.core.project",
+    "File": "overphloem.core.file",
+    "Event": "overphloem.core.events",
+    "on": "overphloem.core.events",
+}
+
+__all__ = ["Project", "File", "Event", "on"]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import public names lazily (PEP 562).
+
+    Args:
+        name (str): Attribute name.
+
+    Returns:
+        Any: The requested attribute.
+
+    Raises:
+        AttributeError: If name is not exported by this package.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    """
+    List module attributes, including the lazily imported ones.
 
-__all__ = ["Project", "File", "Event", "on"]
\ No newline at end of file
+    Returns:
+        list: Attribute names.
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,88 @@
+"""
+Backoff module for adapting polling intervals to project activity.
+"""
+import random
+import threading
+from typing import Optional
+
+
+class AdaptiveInterval:
+    """
+    Polling interval that grows while a project is quiet.
+
+    The interval starts at ``min_s``, is multiplied by ``falloff`` after every
+    quiet check (up to ``max_s``), and resets to ``min_s`` when an event
+    happens. Each wait is jittered so that several listeners started together
+    do not keep waking up at the same moment.
+
+    Attributes:
+        min_s (float): Base polling interval in seconds.
+        max_s (float): Upper bound for the polling interval in seconds.
+        falloff (Optional[float]): Growth factor for quiet checks, or None to
+            keep the interval fixed.
+        jitter (float): Maximum relative deviation applied to each wait.
+        current (float): Current interval before jitter.
+        delay (float): Jittered wait before the next check.
+    """
+
+    def __init__(self, min_s: float, max_s: float = 3600,
+                 falloff: Optional[float] = None, jitter: float = 0.1):
+        """
+        Initialize an AdaptiveInterval object.
+
+        Args:
+            min_s (float): Base polling interval in seconds.
+            max_s (float, optional): Upper bound for the polling interval.
+                Defaults to 3600 (1 hour).
+            falloff (Optional[float], optional): Growth factor for quiet checks.
+                Defaults to None.
+            jitter (float, optional): Maximum relative deviation applied to
+                each wait. Defaults to 0.1.
+        """
+        self.min_s = min_s
+        self.max_s = max(max_s, min_s)
+        self.falloff = falloff
+        self.jitter = jitter
+        self.current = min_s
+        self.delay = self._jittered()
+
+    def _jittered(self) -> float:
+        """
+        Apply jitter to the current interval.
+
+        Returns:
+            float: The jittered interval in seconds.
+        """
+        if not self.jitter:
+            return self.current
+        return self.current * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def tick(self, event_happened: bool) -> float:
+        """
+        Update the interval after a check.
+
+        Args:
+            event_happened (bool): Whether the check found an event.
+
+        Returns:
+            float: The jittered wait before the next check, in seconds.
+        """
+        if event_happened:
+            self.current = self.min_s
+        elif self.falloff is not None:
+            self.current = min(self.current * self.falloff, self.max_s)
+
+        self.delay = self._jittered()
+        return self.delay
+
+    def sleep(self, stop_event: threading.Event) -> bool:
+        """
+        Wait until the next check, returning early if stop_event is set.
+
+        Args:
+            stop_event (threading.Event): Event that interrupts the wait.
+
+        Returns:
+            bool: True if stop_event was set, False if the wait timed out.
+        """
+        return stop_event.wait(self.delay)
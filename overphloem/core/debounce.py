@@ -0,0 +1,102 @@
+"""
+Debounce module for merging bursts of file change events.
+"""
+import time
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+# Default quiet period in milliseconds that ends a burst of changes
+WINDOW_MS = 200
+
+# Result of an event following another one on the same path; None drops both
+_MERGED: Dict[Tuple[str, str], Optional[str]] = {
+    (ADDED, ADDED): ADDED,
+    (ADDED, MODIFIED): ADDED,
+    (ADDED, DELETED): None,
+    (MODIFIED, ADDED): MODIFIED,
+    (MODIFIED, MODIFIED): MODIFIED,
+    (MODIFIED, DELETED): DELETED,
+    (DELETED, ADDED): MODIFIED,
+    (DELETED, MODIFIED): MODIFIED,
+    (DELETED, DELETED): DELETED,
+}
+
+
+class Debouncer:
+    """
+    Buffer file change events and flush them as a single merged batch.
+
+    Events on the same path are collapsed, e.g. an added file that is then
+    deleted disappears from the batch, and repeated modifications are
+    reported once.
+
+    Attributes:
+        window_ms (int): Quiet period in milliseconds before a flush returns.
+    """
+
+    def __init__(self, window_ms: int = WINDOW_MS):
+        """
+        Initialize a Debouncer object.
+
+        Args:
+            window_ms (int, optional): Quiet period in milliseconds before a
+                flush returns. Defaults to 200.
+        """
+        self.window_ms = window_ms
+        self._events: Dict[str, str] = {}
+        self._last_push = 0.0
+        self._cond = threading.Condition()
+
+    def push(self, event_type: str, path: str) -> None:
+        """
+        Add an event to the current batch.
+
+        Args:
+            event_type (str): One of ``ADDED``, ``MODIFIED`` or ``DELETED``.
+            path (str): Path of the file, relative to the project root.
+        """
+        with self._cond:
+            previous = self._events.get(path)
+            merged = event_type if previous is None else _MERGED[previous, event_type]
+            if merged is None:
+                del self._events[path]
+            else:
+                self._events[path] = merged
+            self._last_push = time.monotonic()
+            self._cond.notify_all()
+
+    def push_many(self, events: Iterable[Tuple[str, str]]) -> None:
+        """
+        Add several events to the current batch.
+
+        Args:
+            events (Iterable[Tuple[str, str]]): ``(event_type, path)`` pairs.
+        """
+        for event_type, path in events:
+            self.push(event_type, path)
+
+    def flush(self, stop_event: Optional[threading.Event] = None) -> Dict[str, str]:
+        """
+        Wait for the window to pass without new events, then return the batch.
+
+        Args:
+            stop_event (Optional[threading.Event], optional): Event that ends
+                the wait early. Defaults to None.
+
+        Returns:
+            Dict[str, str]: Mapping of path to merged event type.
+        """
+        window = self.window_ms / 1000
+        with self._cond:
+            while not (stop_event is not None and stop_event.is_set()):
+                remaining = self._last_push + window - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            events, self._events = self._events, {}
+        return events
@@ -3,11 +3,17 @@ Events module for handling Overleaf project events.
 """
 import time
 import enum
+import functools
+import heapq
+import itertools
 import threading
 import logging
-from typing import Callable, Optional, Any, Dict, Union
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Optional, Dict, List, Tuple
 
+from overphloem.core.backoff import AdaptiveInterval
+from overphloem.core.debounce import WINDOW_MS
+from overphloem.core.git import head_commit
 from overphloem.core.project import Project
 
 logger = logging.getLogger(__name__)
@@ -20,32 +26,58 @@ class Event(enum.Enum):
     PUSH = "push"
 
 
-class EventHandler:
+@dataclass(slots=True)
+class ListenerState:
     """
-    Event handler for Overleaf projects.
+    Configuration and runtime state of a registered listener.
 
-    This class manages event listeners for Overleaf projects.
+    Attributes:
+        project_id (str): Overleaf project ID.
+        callback (Callable[[Project], bool]): Callback function to execute when
+            the event occurs.
+        push (bool): Whether to push changes after the callback.
+        interval (int): Base polling interval in seconds.
+        falloff (Optional[float]): Falloff factor for increasing the interval.
+        last_check (float): Time of the last check, as returned by time.time().
+        backoff (AdaptiveInterval): Polling interval state; ``backoff.current``
+            is the current interval in seconds.
+        project (Optional[Project]): Project being monitored, set on the first
+            check.
+        last_commit_hash (Optional[str]): Commit hash seen by the last check.
+        pending (bool): Whether a change was seen and the callback waits for
+            a check that finds no newer commit.
     """
+    project_id: str
+    callback: Callable[[Project], bool]
+    push: bool
+    interval: int
+    falloff: Optional[float]
+    last_check: float
+    backoff: AdaptiveInterval
+    project: Optional[Project] = None
+    last_commit_hash: Optional[str] = None
+    pending: bool = False
 
-    _instance = None
-    _lock = threading.Lock()
 
-    def __new__(cls):
-        """Implement singleton pattern."""
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(EventHandler, cls).__new__(cls)
-                cls._instance._initialized = False
-        return cls._instance
+class EventHandler:
+    """
+    Event handler for Overleaf projects.
+
+    This class manages event listeners for Overleaf projects. Change
+    listeners are checked by a single scheduler thread, which sleeps until
+    the earliest listener is due.
+    """
 
     def __init__(self):
         """Initialize the event handler."""
-        if self._initialized:
-            return
-
-        self._listeners = {event: {} for event in Event}
-        self._running_threads = {}
-        self._initialized = True
+        self._listeners: Dict[Event, Dict[str, ListenerState]] = {
+            event: {} for event in Event
+        }
+        # Min-heap of (deadline, sequence, listener_id, state) for due checks
+        self._schedule: List[Tuple[float, int, str, ListenerState]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._scheduler_thread: Optional[threading.Thread] = None
 
     def register(self, event: Event, project_id: str, callback: Callable[[Project], bool],
                 push: bool = False, interval: int = 60, falloff: Optional[float] = None) -> str:
@@ -64,18 +96,19 @@ class EventHandler:
             str: Listener ID for unregistering.
         """
         listener_id = f"{project_id}_{event.value}_{id(callback)}"
-        self._listeners[event][listener_id] = {
-            "project_id": project_id,
-            "callback": callback,
-            "push": push,
-            "interval": interval,
-            "falloff": falloff,
-            "current_interval": interval,
-            "last_check": time.time()
-        }
+        state = ListenerState(
+            project_id=project_id,
+            callback=callback,
+            push=push,
+            interval=interval,
+            falloff=falloff,
+            last_check=time.time(),
+            backoff=AdaptiveInterval(interval, falloff=falloff),
+        )
+        self._listeners[event][listener_id] = state
 
         if event == Event.CHANGE:
-            self._start_change_thread(listener_id, project_id, interval)
+            self._schedule_check(listener_id, state)
 
         return listener_id
 
@@ -91,76 +124,103 @@ class EventHandler:
         """
         for event in Event:
             if listener_id in self._listeners[event]:
+                # The scheduler drops checks for listeners no longer registered
                 del self._listeners[event][listener_id]
-                if listener_id in self._running_threads:
-                    self._running_threads[listener_id]["stop"] = True
                 return True
         return False
 
-    def _start_change_thread(self, listener_id: str, project_id: str, interval: int) -> None:
+    def _schedule_check(self, listener_id: str, state: ListenerState,
+                        delay: float = 0) -> None:
         """
-        Start a thread for monitoring project changes.
+        Schedule a change check, starting the scheduler thread if needed.
 
         Args:
             listener_id (str): Listener ID.
-            project_id (str): Overleaf project ID.
-            interval (int): Polling interval in seconds.
+            state (ListenerState): State of the listener to check.
+            delay (float, optional): Seconds until the check. Defaults to 0.
         """
-        thread_data = {"stop": False}
-        self._running_threads[listener_id] = thread_data
-
-        thread = threading.Thread(
-            target=self._monitor_changes,
-            args=(listener_id, thread_data),
-            daemon=True
-        )
-        thread.start()
-
-    def _monitor_changes(self, listener_id: str, thread_data: Dict[str, Any]) -> None:
+        with self._cond:
+            heapq.heappush(
+                self._schedule,
+                (time.monotonic() + delay, next(self._sequence), listener_id, state)
+            )
+            if self._scheduler_thread is None:
+                self._scheduler_thread = threading.Thread(
+                    target=self._run_scheduler,
+                    name="overphloem-scheduler",
+                    daemon=True
+                )
+                self._scheduler_thread.start()
+            self._cond.notify()
+
+    def _run_scheduler(self) -> None:
         """
-        Monitor project for changes.
-
-        Args:
-            listener_id (str): Listener ID.
-            thread_data (Dict[str, Any]): Thread control data.
+        Run change checks as they become due, in a single thread.
         """
-        event = Event.CHANGE
-        if listener_id not in self._listeners[event]:
-            return
-
-        config = self._listeners[event][listener_id]
-        project = Project(config["project_id"])
-        project.pull()  # Initial pull
-
-        last_commit_hash = self._get_latest_commit_hash(project)
-
-        while not thread_data["stop"]:
-            time.sleep(config["current_interval"])
+        while True:
+            with self._cond:
+                while not self._schedule or self._schedule[0][0] > time.monotonic():
+                    timeout = (
+                        self._schedule[0][0] - time.monotonic()
+                        if self._schedule else None
+                    )
+                    self._cond.wait(timeout)
+                _, _, listener_id, state = heapq.heappop(self._schedule)
 
-            if thread_data["stop"]:
-                break
+            # Skip listeners that were unregistered (or replaced) meanwhile
+            if self._listeners[Event.CHANGE].get(listener_id) is not state:
+                continue
 
-            try:
-                project.pull()
-                current_hash = self._get_latest_commit_hash(project)
+            self._check_once(state)
+            # Check again soon while a change waits for its burst to end
+            delay = WINDOW_MS / 1000 if state.pending else state.backoff.delay
+            self._schedule_check(listener_id, state, delay)
 
-                if current_hash != last_commit_hash:
-                    last_commit_hash = current_hash
-                    should_push = config["callback"](project)
+    def _check_once(self, state: ListenerState) -> None:
+        """
+        Check a project for changes once.
 
-                    if should_push and config["push"]:
-                        project.push()
+        The first check only pulls the project and records its commit hash.
+        A change runs the callback once a later check finds no newer commit,
+        so a burst of commits calls back once.
 
-                    # Reset interval after successful event
-                    config["current_interval"] = config["interval"]
-                elif config["falloff"] is not None:
-                    # Apply falloff to increase wait time
-                    config["current_interval"] = min(
-                        config["current_interval"] * config["falloff"],
-                        3600  # Max interval: 1 hour
-                    )
-            except Exception as e:
-                logger.error(f"Error in change monitor: {e}")
+        Args:
+            state (ListenerState): State of the listener to check.
+        """
+        try:
+            state.last_check = time.time()
+            if state.project is None:
+                project = Project(state.project_id)
+                project.pull()  # Initial pull
+                state.last_commit_hash = self._get_latest_commit_hash(project)
+                state.project = project
+                return
+
+            project = state.project
+            project.pull()
+            current_hash = self._get_latest_commit_hash(project)
+            changed = current_hash != state.last_commit_hash
+
+            if changed:
+                # Wait for the burst to end before calling back
+                state.last_commit_hash = current_hash
+                state.pending = True
+                return
+
+            called = state.pending
+            if called:
+                state.pending = False
+                should_push = state.callback(project)
+
+                if should_push and state.push:
+                    # The callback may have changed files without telling us
+                    project.mark_dirty()
+                    project.push()
+
+            # Reset interval after an event, back off otherwise
+            state.backoff.tick(called)
+        except Exception as e:
+            logger.error(f"Error in change monitor: {e}")
 
     def _get_latest_commit_hash(self, project: Project) -> str:
         """
@@ -172,23 +232,18 @@ class EventHandler:
         Returns:
             str: The latest commit hash, or empty string on error.
         """
-        import subprocess
+        return head_commit(project.local_path)
 
-        try:
-            result = subprocess.run(
-                ["git", "rev-parse", "HEAD"],
-                cwd=project.local_path,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError:
-            return ""
 
+@functools.cache
+def _handler() -> EventHandler:
+    """
+    Get the global event handler, creating it on first use.
 
-# Global event handler instance
-_handler = EventHandler()
+    Returns:
+        EventHandler: The process-wide event handler.
+    """
+    return EventHandler()
 
 
 def on(event: Event, project_id: str, push: bool = False, interval: int = 60,
@@ -208,6 +263,6 @@ def on(event: Event, project_id: str, push: bool = False, interval: int = 60,
     """
     def decorator(func: Callable) -> Callable:
         """Register the decorated function as an event listener."""
-        _handler.register(event, project_id, func, push, interval, falloff)
+        _handler().register(event, project_id, func, push, interval, falloff)
         return func
     return decorator
\ No newline at end of file
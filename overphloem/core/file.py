@@ -1,7 +1,8 @@
 """
 File module for handling files in Overleaf projects.
 """
-from typing import Optional, Union
+import os
+from typing import Optional, Tuple
 from pathlib import Path
 
 
@@ -15,6 +16,8 @@ class File:
         project: Reference to the parent Project object.
     """
 
+    __slots__ = ("path", "relative_path", "project", "_content", "_stat")
+
     def __init__(self, path: Path, relative_path: Path, project):
         """
         Initialize a File object.
@@ -28,6 +31,8 @@ class File:
         self.relative_path = relative_path
         self.project = project
         self._content = None
+        # (mtime_ns, size, inode) of the file when _content was read or written
+        self._stat: Optional[Tuple[int, int, int]] = None
 
     @property
     def name(self) -> str:
@@ -50,6 +55,7 @@ class File:
         if self._content is None:
             with open(self.path, "r", encoding="utf-8") as f:
                 self._content = f.read()
+                self._stat = _stat_key(os.fstat(f.fileno()))
         return self._content
 
     @content.setter
@@ -57,13 +63,54 @@ class File:
         """
         Set the file content.
 
+        Assigning the cached content again does not touch the disk, unless
+        the file was changed since (e.g. by a pull). Inside
+        ``Project.batch_write()`` the write is deferred until the batch ends.
+
         Args:
             new_content (str): New content to write to the file.
         """
-        with open(self.path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        if new_content == self._content and self._stat == self._disk_stat():
+            return
+
         self._content = new_content
 
+        pending = self.project._pending_writes
+        if pending is not None:
+            pending[self.path] = self
+            return
+
+        self._write()
+
+    def _write(self, fsync: bool = False) -> None:
+        """
+        Write the cached content to disk.
+
+        Args:
+            fsync (bool, optional): Whether to fsync the file after writing.
+                Defaults to False.
+        """
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(self._content)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            self._stat = _stat_key(os.fstat(f.fileno()))
+        self.project.mark_dirty(self.relative_path)
+
+    def _disk_stat(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Get the current (mtime_ns, size, inode) of the file on disk.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: The stat key, or None if the file
+            cannot be stat'ed.
+        """
+        try:
+            return _stat_key(os.stat(self.path))
+        except OSError:
+            return None
+
     def is_tex(self) -> bool:
         """
         Check if the file is a TeX file.
@@ -80,4 +127,17 @@ class File:
         Returns:
             str: String representation of the file.
         """
-        return f"File({self.relative_path})"
\ No newline at end of file
+        return f"File({self.relative_path})"
+
+
+def _stat_key(stat: os.stat_result) -> Tuple[int, int, int]:
+    """
+    Reduce a stat result to the fields that change when a file is rewritten.
+
+    Args:
+        stat (os.stat_result): Result of ``os.stat`` or ``os.fstat``.
+
+    Returns:
+        Tuple[int, int, int]: (mtime_ns, size, inode).
+    """
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
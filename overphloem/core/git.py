@@ -0,0 +1,282 @@
+"""
+Git helpers that avoid spawning git processes for cheap lookups.
+"""
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Repositories opened through libgit2, reused across lookups. Keyed by the
+# resolved .git path, so different spellings of a directory share a handle.
+_repositories: Dict[Path, Any] = {}
+
+# Parsed packed-refs per repository, keyed by the file's mtime.
+_packed_refs: Dict[Path, Tuple[int, Dict[str, str]]] = {}
+
+# (username, password) per remote URL, from git's credential helpers
+_credentials: Dict[str, Tuple[str, str]] = {}
+
+
+def head_commit(local_path: Union[str, Path]) -> str:
+    """
+    Get the commit hash HEAD points to, using the cheapest available method.
+
+    Tries libgit2 (when pygit2 is installed), then reading the .git directory
+    directly, and finally ``git rev-parse``.
+
+    Args:
+        local_path (Union[str, Path]): Path to the repository working tree.
+
+    Returns:
+        str: The commit hash, or empty string if it cannot be resolved.
+    """
+    git_dir = Path(local_path) / ".git"
+
+    if pygit2 is not None:
+        try:
+            return str(open_repository(local_path).head.target)
+        except (pygit2.GitError, KeyError, ValueError):
+            pass
+
+    commit = read_head(local_path)
+    if commit:
+        return commit
+
+    try:
+        result = subprocess.run(
+            ["git", "--git-dir", str(git_dir), "rev-parse", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def open_repository(local_path: Union[str, Path]) -> "pygit2.Repository":
+    """
+    Open a repository through libgit2, reusing the handle across calls.
+
+    Args:
+        local_path (Union[str, Path]): Path to the repository working tree.
+
+    Returns:
+        pygit2.Repository: The repository.
+
+    Raises:
+        pygit2.GitError: If there is no repository at local_path.
+    """
+    git_dir = (Path(local_path) / ".git").resolve()
+    repo = _repositories.get(git_dir)
+    if repo is None:
+        # Opening the .git directory itself stops libgit2 from searching
+        # parent directories for another repository
+        repo = _repositories[git_dir] = pygit2.Repository(str(git_dir))
+    return repo
+
+
+def clone_repository(url: str, local_path: Union[str, Path]) -> "pygit2.Repository":
+    """
+    Clone a repository through libgit2, caching the handle for open_repository.
+
+    Args:
+        url (str): URL of the remote repository.
+        local_path (Union[str, Path]): Path to clone into.
+
+    Returns:
+        pygit2.Repository: The cloned repository.
+
+    Raises:
+        pygit2.GitError: If the clone fails.
+    """
+    repo = pygit2.clone_repository(
+        url, str(local_path), callbacks=RemoteCallbacks()
+    )
+    _repositories[(Path(local_path) / ".git").resolve()] = repo
+    return repo
+
+
+def forget_repository(local_path: Union[str, Path]) -> None:
+    """
+    Drop the cached state for a repository, e.g. before it is cloned again.
+
+    Args:
+        local_path (Union[str, Path]): Path to the repository working tree.
+    """
+    git_dir = Path(local_path) / ".git"
+    _repositories.pop(git_dir.resolve(), None)
+    _packed_refs.pop(git_dir, None)
+
+
+def read_head(local_path: Union[str, Path]) -> str:
+    """
+    Get the commit hash HEAD points to by reading the .git directory directly.
+
+    HEAD is read on every call, so switching branches is picked up, and is
+    resolved through at most one symbolic ref.
+
+    Args:
+        local_path (Union[str, Path]): Path to the repository working tree.
+
+    Returns:
+        str: The commit hash, or empty string if it cannot be resolved.
+    """
+    git_dir = Path(local_path) / ".git"
+    head_file = git_dir / "HEAD"
+    try:
+        with open(head_file, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return ""
+
+    if not head.startswith("ref: "):
+        # Detached HEAD holds the commit hash itself
+        return head
+
+    ref = head[len("ref: "):].strip()
+    try:
+        with open(git_dir / ref, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return _read_packed_ref(git_dir, ref)
+
+
+def _read_packed_ref(git_dir: Path, ref: str) -> str:
+    """
+    Look up a ref in .git/packed-refs, re-parsing only when the file changes.
+
+    Args:
+        git_dir (Path): Path to the .git directory.
+        ref (str): Full ref name, e.g. ``refs/heads/master``.
+
+    Returns:
+        str: The commit hash, or empty string if the ref is not packed.
+    """
+    packed_file = git_dir / "packed-refs"
+    try:
+        mtime_ns = os.stat(packed_file).st_mtime_ns
+    except OSError:
+        return ""
+
+    cached = _packed_refs.get(git_dir)
+    if cached is None or cached[0] != mtime_ns:
+        refs = {}
+        try:
+            with open(packed_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    # Skip the header and peeled-tag lines
+                    if line.startswith(("#", "^")):
+                        continue
+                    parts = line.split()
+                    if len(parts) == 2:
+                        refs[parts[1]] = parts[0]
+        except OSError:
+            return ""
+        cached = (mtime_ns, refs)
+        _packed_refs[git_dir] = cached
+
+    return cached[1].get(ref, "")
+
+
+def fill_credentials(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Ask git's configured credential helpers for a remote's credentials.
+
+    The answer is cached, so ``git credential`` runs at most once per remote.
+    Git is never allowed to prompt on the terminal.
+
+    Args:
+        url (str): URL of the remote.
+
+    Returns:
+        Optional[Tuple[str, str]]: (username, password), or None if no
+        helper could provide them.
+    """
+    cached = _credentials.get(url)
+    if cached is not None:
+        return cached
+
+    try:
+        result = subprocess.run(
+            ["git", "credential", "fill"],
+            input=f"url={url}\n\n",
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    fields = dict(
+        line.split("=", 1) for line in result.stdout.splitlines() if "=" in line
+    )
+    if "username" not in fields or "password" not in fields:
+        return None
+
+    _credentials[url] = (fields["username"], fields["password"])
+    return _credentials[url]
+
+
+if pygit2 is not None:
+    class RemoteCallbacks(pygit2.RemoteCallbacks):
+        """
+        libgit2 remote callbacks that authenticate like the git command line.
+
+        Credentials come from git's credential helpers, and rejected pushes
+        raise instead of being silently ignored.
+        """
+
+        def __init__(self):
+            """Initialize a RemoteCallbacks object."""
+            super().__init__()
+            self._attempted = False
+
+        def credentials(self, url: str, username_from_url: Optional[str],
+                        allowed_types: Any) -> Any:
+            """
+            Provide credentials for a remote.
+
+            Args:
+                url (str): URL of the remote.
+                username_from_url (Optional[str]): Username from the URL, if any.
+                allowed_types (Any): CredentialType flags the remote accepts.
+
+            Returns:
+                Any: A pygit2 credential object.
+
+            Raises:
+                pygit2.GitError: If no usable credentials are available, or
+                    the ones provided were rejected.
+            """
+            if self._attempted:
+                # libgit2 asks again when the previous answer was rejected
+                _credentials.pop(url, None)
+                raise pygit2.GitError(f"Authentication failed for {url}")
+            self._attempted = True
+
+            if allowed_types & pygit2.enums.CredentialType.USERPASS_PLAINTEXT:
+                credentials = fill_credentials(url)
+                if credentials is not None:
+                    return pygit2.UserPass(*credentials)
+            raise pygit2.GitError(f"No credentials available for {url}")
+
+        def push_update_reference(self, refname: str, message: Optional[str]) -> None:
+            """
+            Report the remote's response to a pushed reference.
+
+            Args:
+                refname (str): Name of the reference on the remote.
+                message (Optional[str]): Rejection message, or None if accepted.
+
+            Raises:
+                pygit2.GitError: If the remote rejected the update.
+            """
+            if message is not None:
+                raise pygit2.GitError(f"Push of {refname} rejected: {message}")
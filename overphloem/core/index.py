@@ -0,0 +1,183 @@
+"""
+Index module for persisting file states between runs.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Set, Tuple, Union
+
+# (mtime_ns, size, digest) of a file
+FileState = Tuple[int, int, bytes]
+
+
+class FileIndex:
+    """
+    On-disk index of file states, backed by SQLite.
+
+    Keeps per-file metadata out of memory for large projects and lets a
+    later run reuse the digests of files that have not changed since.
+    Supports the subset of the dict interface used for change tracking.
+
+    Attributes:
+        path (Path): Path to the SQLite database file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize a FileIndex object.
+
+        Args:
+            path (Union[str, Path]): Path to the SQLite database file. It is
+                created if it does not exist.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_index ("
+                "rel_path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash BLOB)"
+            )
+
+    @classmethod
+    def for_project(cls, project) -> "FileIndex":
+        """
+        Open the index stored inside a project's .git directory.
+
+        Keeping it under .git means it is never committed with the project.
+
+        Args:
+            project: Project whose local repository holds the index.
+
+        Returns:
+            FileIndex: The opened index.
+        """
+        return cls(Path(project.local_path) / ".git" / "overphloem-index.sqlite")
+
+    def get(self, rel_path: str,
+            default: Optional[FileState] = None) -> Optional[FileState]:
+        """
+        Get the stored state of a file.
+
+        Args:
+            rel_path (str): Path relative to the project root.
+            default (Optional[FileState], optional): Value returned when the
+                file is not indexed. Defaults to None.
+
+        Returns:
+            Optional[FileState]: The (mtime_ns, size, digest) tuple, or default.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, hash FROM file_index WHERE rel_path = ?",
+                (rel_path,),
+            ).fetchone()
+        return default if row is None else (row[0], row[1], bytes(row[2]))
+
+    def update(self, states: Union[Mapping[str, FileState],
+                                   Iterable[Tuple[str, FileState]]]) -> None:
+        """
+        Store the states of several files in one transaction.
+
+        Args:
+            states (Union[Mapping[str, FileState], Iterable[Tuple[str, FileState]]]):
+                New states keyed by relative path.
+        """
+        items = states.items() if isinstance(states, Mapping) else states
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_index VALUES (?, ?, ?, ?)",
+                ((rel_path, *state) for rel_path, state in items),
+            )
+
+    def remove(self, rel_paths: Iterable[str]) -> None:
+        """
+        Forget several files in one transaction.
+
+        Args:
+            rel_paths (Iterable[str]): Paths relative to the project root.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM file_index WHERE rel_path = ?",
+                ((rel_path,) for rel_path in rel_paths),
+            )
+
+    def keys(self) -> Set[str]:
+        """
+        Get the paths of all indexed files.
+
+        Returns:
+            Set[str]: Paths relative to the project root.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT rel_path FROM file_index").fetchall()
+        return {row[0] for row in rows}
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __getitem__(self, rel_path: str) -> FileState:
+        """
+        Get the stored state of a file.
+
+        Args:
+            rel_path (str): Path relative to the project root.
+
+        Returns:
+            FileState: The (mtime_ns, size, digest) tuple.
+
+        Raises:
+            KeyError: If the file is not indexed.
+        """
+        state = self.get(rel_path)
+        if state is None:
+            raise KeyError(rel_path)
+        return state
+
+    def __setitem__(self, rel_path: str, state: FileState) -> None:
+        """
+        Store the state of a file.
+
+        Args:
+            rel_path (str): Path relative to the project root.
+            state (FileState): The (mtime_ns, size, digest) tuple.
+        """
+        self.update([(rel_path, state)])
+
+    def __delitem__(self, rel_path: str) -> None:
+        """
+        Forget a file.
+
+        Args:
+            rel_path (str): Path relative to the project root.
+        """
+        self.remove([rel_path])
+
+    def __contains__(self, rel_path: object) -> bool:
+        """
+        Check whether a file is indexed.
+
+        Args:
+            rel_path (object): Path relative to the project root.
+
+        Returns:
+            bool: True if the file is indexed, False otherwise.
+        """
+        return isinstance(rel_path, str) and self.get(rel_path) is not None
+
+    def __len__(self) -> int:
+        """
+        Get the number of indexed files.
+
+        Returns:
+            int: Number of indexed files.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM file_index").fetchone()[0]
@@ -2,7 +2,10 @@
 Project module for interacting with Overleaf projects.
 """
 
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Set, Union
+from contextlib import contextmanager
+import os
+import shlex
 import shutil
 import tempfile
 import subprocess
@@ -10,10 +13,19 @@ import logging
 from pathlib import Path
 
 from overphloem.core.file import File
+from overphloem.core.git import (
+    clone_repository, forget_repository, head_commit, open_repository, pygit2
+)
+from overphloem.utils.utils import walk_files
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Exit codes of the batched push script, by failing step
+_PUSH_ADD_FAILED = 10
+_PUSH_REBASE_FAILED = 11
+_PUSH_PUSH_FAILED = 12
+
 
 class Project:
     """
@@ -29,7 +41,8 @@ class Project:
         files (List[File]): List of files in the project.
     """
 
-    def __init__(self, project_id: str, local_path: Optional[Union[str, Path]] = None):
+    def __init__(self, project_id: str, local_path: Optional[Union[str, Path]] = None,
+                 use_pygit2: Optional[bool] = None):
         """
         Initialize a Project object.
 
@@ -37,8 +50,12 @@ class Project:
             project_id (str): The Overleaf project ID.
             local_path (Optional[Union[str, Path]]): Path to local directory.
                 If None, a temporary directory will be created.
+            use_pygit2 (Optional[bool], optional): Whether to run git operations
+                in-process through libgit2, falling back to the git command when
+                they fail. Defaults to None, which uses pygit2 if it is installed.
         """
         self.project_id = project_id
+        self.use_pygit2 = pygit2 is not None and use_pygit2 is not False
 
         if local_path is None:
             self.local_path = Path(tempfile.mkdtemp())
@@ -47,8 +64,15 @@ class Project:
             if not self.local_path.exists():
                 self.local_path.mkdir(parents=True)
 
-        self._files: Optional[List[File]] = None
+        # Files keyed by relative path, in load order. Values stay None until
+        # the File object is first asked for.
+        self._files: Optional[Dict[str, Optional[File]]] = None
         self._git_repo = None
+        self._git_initialized = False
+        self._pending_writes: Optional[Dict[Path, File]] = None
+        # Relative paths changed since the last push, or None when unknown
+        # (e.g. after edits made outside overphloem), which stages everything
+        self._dirty: Optional[Set[str]] = None
 
     @property
     def main_file(self) -> str:
@@ -63,6 +87,16 @@ class Project:
         """
         return "main.tex"
 
+    @property
+    def git_url(self) -> str:
+        """
+        Get the URL of the project's Overleaf git remote.
+
+        Returns:
+            str: The remote URL.
+        """
+        return f"https://git.overleaf.com/{self.project_id}"
+
     @property
     def files(self) -> List[File]:
         """
@@ -73,17 +107,94 @@ class Project:
         """
         if self._files is None:
             self._load_files()
-        return self._files or []
+        return [self._file(relative_path) for relative_path in self._files]
 
     def _load_files(self) -> None:
         """
-        Load project files from the local directory.
+        Load project file paths from the local directory.
+
+        File objects are only created when they are first asked for.
+        """
+        # Entry paths all start with the root, so slicing it off is enough
+        prefix = len(os.path.join(self.local_path, ""))
+        self._files = dict.fromkeys(
+            entry.path[prefix:] for entry in walk_files(self.local_path)
+        )
+
+    def _file(self, relative_path: str) -> File:
+        """
+        Get the File object for a loaded path, creating it on first use.
+
+        Args:
+            relative_path (str): Path relative to project root, as loaded.
+
+        Returns:
+            File: The File object.
+        """
+        file = self._files[relative_path]
+        if file is None:
+            file = self._files[relative_path] = File(
+                self.local_path / relative_path, Path(relative_path), self
+            )
+        return file
+
+    def mark_dirty(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Record that a file was changed, so the next push stages it.
+
+        Changes made through ``File`` and the project's own methods are
+        recorded automatically. After the first push, a push stages only
+        the recorded paths, so call this after changing files by other
+        means, e.g. ``mark_dirty()`` after running a script over the project.
+
+        Args:
+            path (Optional[Union[str, Path]], optional): Path to the file,
+                relative to project root. Defaults to None, which marks the
+                whole project so the next push stages every change.
+        """
+        if path is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            self._dirty.add(str(Path(path)))
+
+    @contextmanager
+    def batch_write(self, fsync: bool = False) -> Iterator[None]:
+        """
+        Defer writes made through ``File.content`` until the block exits.
+
+        Each file is written once at the end, however many times its content
+        was set, so watchers see a single burst of changes.
+
+        Args:
+            fsync (bool, optional): Whether to fsync each file when the batch
+                is flushed. Defaults to False.
+
+        Yields:
+            None
+        """
+        nested = self._pending_writes is not None
+        if not nested:
+            self._pending_writes = {}
+        try:
+            yield
+        finally:
+            if not nested:
+                self.flush(fsync)
+                self._pending_writes = None
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Write all content deferred by ``batch_write``.
+
+        Args:
+            fsync (bool, optional): Whether to fsync each file after writing.
+                Defaults to False.
         """
-        self._files = []
-        for path in self.local_path.glob("**/*"):
-            if path.is_file() and ".git" not in path.parts:
-                relative_path = path.relative_to(self.local_path)
-                self._files.append(File(path, relative_path, self))
+        if not self._pending_writes:
+            return
+        for file in self._pending_writes.values():
+            file._write(fsync)
+        self._pending_writes.clear()
 
     def pull(self) -> bool:
         """
@@ -99,6 +210,19 @@ class Project:
             )
             return False
 
+        if self._remote_unchanged():
+            logger.debug(f"Project {self.project_id} is already up to date")
+            return True
+
+        if self.use_pygit2:
+            try:
+                logger.info(f"Pulling changes for project {self.project_id}")
+                self._pull_pygit2()
+                self._load_files()  # Reload files after pull
+                return True
+            except (pygit2.GitError, KeyError, ValueError) as e:
+                logger.info(f"In-process pull failed, falling back to git: {e}")
+
         # Pull latest changes
         try:
             logger.info(f"Pulling changes for project {self.project_id}")
@@ -116,6 +240,47 @@ class Project:
             )
             return False
 
+    def _remote_unchanged(self) -> bool:
+        """
+        Check whether the remote master is the commit HEAD already points to.
+
+        Only asks the remote for its refs, which is much cheaper than a fetch.
+
+        Returns:
+            bool: True if there is nothing to pull, False if there may be or
+            the remote could not be asked.
+        """
+        head = head_commit(self.local_path)
+        if not head:
+            return False
+
+        if self.use_pygit2:
+            from overphloem.core.git import RemoteCallbacks
+
+            try:
+                heads = self._repository().remotes["origin"].list_heads(
+                    callbacks=RemoteCallbacks()
+                )
+                return any(
+                    ref.name == "refs/heads/master" and str(ref.oid) == head
+                    for ref in heads
+                )
+            except (pygit2.GitError, KeyError, ValueError, AttributeError):
+                pass
+
+        try:
+            result = subprocess.run(
+                ["git", "ls-remote", "origin", "refs/heads/master"],
+                cwd=self.local_path,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return False
+        # Output is "<oid>\trefs/heads/master", or empty without the branch
+        return result.stdout.split("\t", 1)[0] == head
+
     def push(self) -> bool:
         """
         Push local changes to the Overleaf project.
@@ -132,44 +297,67 @@ class Project:
             )
             return False
 
+        dirty = self._dirty
+
+        if self.use_pygit2:
+            try:
+                self._push_pygit2(dirty)
+                self._dirty = set()
+                return True
+            except (pygit2.GitError, KeyError, ValueError) as e:
+                logger.info(f"In-process push failed, falling back to git: {e}")
+
+        # Run all steps in one shell rather than launching git once per step.
+        # Each step that can fail exits with its own code, so a failed rebase
+        # can be told apart from the other failures.
+        message = shlex.quote("Update via overphloem")
+        if dirty is None:
+            add = "git add ."
+        else:
+            # Stage only the known changes; removals go through git rm, which
+            # tolerates paths git never saw (files created and deleted again)
+            steps = []
+            existing = sorted(p for p in dirty if (self.local_path / p).is_file())
+            missing = sorted(dirty.difference(existing))
+            if existing:
+                steps.append(f"git add -- {' '.join(map(shlex.quote, existing))}")
+            if missing:
+                steps.append(
+                    "git rm -q --cached --ignore-unmatch -- "
+                    + " ".join(map(shlex.quote, missing))
+                )
+            add = " && ".join(steps) or "true"
+        script = (
+            f"{add} || exit {_PUSH_ADD_FAILED}\n"
+            # No changes to commit is fine, continue with push
+            f"git commit -m {message} || true\n"
+            # Pull with rebase before pushing to handle divergent branches
+            f"git pull --rebase origin master || exit {_PUSH_REBASE_FAILED}\n"
+            f"git push origin master || exit {_PUSH_PUSH_FAILED}\n"
+        )
+
         try:
-            # Add all changes
-            logger.info(f"Adding changes for project {self.project_id}")
-            subprocess.run(
-                ["git", "add", "."],
+            logger.info(f"Pushing changes for project {self.project_id}")
+            result = subprocess.run(
+                ["sh", "-c", script],
                 cwd=self.local_path,
                 check=True,
                 capture_output=True,
+                text=True,
             )
-
-            # Commit changes
-            try:
-                logger.info(f"Committing changes for project {self.project_id}")
-                subprocess.run(
-                    ["git", "commit", "-m", "Update via overphloem"],
-                    cwd=self.local_path,
-                    check=True,
-                    capture_output=True,
-                )
-            except subprocess.CalledProcessError:
-                # No changes to commit, continue with push
-                logger.info("No changes to commit")
-                pass
-
-            # Pull with rebase before pushing to handle divergent branches
-            logger.info(f"Pulling with rebase for project {self.project_id}")
-            try:
-                subprocess.run(
-                    ["git", "pull", "--rebase", "origin", "master"],
-                    cwd=self.local_path,
-                    check=True,
-                    capture_output=True,
-                )
-            except subprocess.CalledProcessError as e:
+            logger.debug(f"Git push output: {result.stdout}")
+            self._dirty = set()
+            return True
+        except subprocess.CalledProcessError as e:
+            if e.returncode == _PUSH_REBASE_FAILED:
                 logger.error(f"Pull with rebase failed: {e}")
-                logger.error(
-                    f"Error output: {e.stderr if hasattr(e, 'stderr') else 'No error output'}"
-                )
+            else:
+                logger.error(f"Failed to push project: {e}")
+            logger.error(
+                f"Error output: {e.stderr if hasattr(e, 'stderr') else 'No error output'}"
+            )
+
+            if e.returncode == _PUSH_REBASE_FAILED:
                 # If there are conflicts, abort the rebase
                 try:
                     subprocess.run(
@@ -180,23 +368,104 @@ class Project:
                     )
                 except:
                     pass
-                return False
+            return False
 
-            # Push changes
-            logger.info(f"Pushing changes for project {self.project_id}")
-            subprocess.run(
-                ["git", "push", "origin", "master"],
-                cwd=self.local_path,
-                check=True,
-                capture_output=True,
-            )
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to push project: {e}")
-            logger.error(
-                f"Error output: {e.stderr if hasattr(e, 'stderr') else 'No error output'}"
+    def _repository(self) -> "pygit2.Repository":
+        """
+        Get the libgit2 handle for the local repository, opening it once.
+
+        The handle is shared with ``head_commit`` and other users of
+        ``open_repository`` for the same path.
+
+        Returns:
+            pygit2.Repository: The repository.
+        """
+        if self._git_repo is None:
+            self._git_repo = open_repository(self.local_path)
+        return self._git_repo
+
+    def _pull_pygit2(self) -> None:
+        """
+        Fetch and fast-forward master in-process.
+
+        Raises:
+            pygit2.GitError: If the fetch fails, the branches have diverged, or
+                local changes would be overwritten.
+        """
+        from overphloem.core.git import RemoteCallbacks
+
+        repo = self._repository()
+        repo.remotes["origin"].fetch(callbacks=RemoteCallbacks())
+        remote_oid = repo.lookup_reference("refs/remotes/origin/master").target
+
+        analysis, _ = repo.merge_analysis(remote_oid)
+        if analysis & pygit2.enums.MergeAnalysis.UP_TO_DATE:
+            return
+        if not analysis & pygit2.enums.MergeAnalysis.FASTFORWARD or \
+                repo.head.name != "refs/heads/master":
+            raise pygit2.GitError("Cannot fast-forward master")
+
+        # The default safe checkout refuses to overwrite local changes
+        repo.checkout_tree(repo.get(remote_oid))
+        repo.head.set_target(remote_oid)
+
+    def _push_pygit2(self, dirty: Optional[Set[str]] = None) -> None:
+        """
+        Commit all changes and push master in-process.
+
+        Args:
+            dirty (Optional[Set[str]], optional): Relative paths to stage.
+                Defaults to None, which stages every change in the project.
+
+        Raises:
+            pygit2.GitError: If the push fails, or the remote has commits that
+                would need a rebase.
+        """
+        from overphloem.core.git import RemoteCallbacks
+
+        repo = self._repository()
+
+        logger.info(f"Adding changes for project {self.project_id}")
+        index = repo.index
+        index.read()
+        if dirty is None:
+            index.add_all()
+            for path, flags in repo.status().items():
+                if flags & pygit2.enums.FileStatus.WT_DELETED:
+                    index.remove(path)
+        else:
+            # Only touch the known changes instead of scanning the whole tree
+            for path in dirty:
+                entry = Path(path).as_posix()
+                if (self.local_path / path).is_file():
+                    index.add(entry)
+                elif entry in index:
+                    index.remove(entry)
+        index.write()
+
+        tree = index.write_tree()
+        parent = repo.head.target
+        if tree != repo[parent].tree_id:
+            logger.info(f"Committing changes for project {self.project_id}")
+            signature = repo.default_signature
+            repo.create_commit(
+                "HEAD", signature, signature, "Update via overphloem", tree, [parent]
             )
-            return False
+        else:
+            logger.info("No changes to commit")
+
+        remote = repo.remotes["origin"]
+        remote.fetch(callbacks=RemoteCallbacks())
+        remote_oid = repo.lookup_reference("refs/remotes/origin/master").target
+        head_oid = repo.head.target
+        if head_oid == remote_oid:
+            return
+        if not repo.descendant_of(head_oid, remote_oid):
+            # Leave rebasing onto the remote's new commits to git
+            raise pygit2.GitError("Remote has new commits")
+
+        logger.info(f"Pushing changes for project {self.project_id}")
+        remote.push(["refs/heads/master"], callbacks=RemoteCallbacks())
 
     def _init_git_repo(self) -> bool:
         """
@@ -205,59 +474,85 @@ class Project:
         Returns:
             bool: True if initialization was successful, False otherwise.
         """
+        # Once set up, the repository is not probed again on every pull/push
+        if self._git_initialized:
+            return True
+
         git_dir = self.local_path / ".git"
 
         if not git_dir.exists():
+            # Handles cached for a repository that was removed are stale
+            forget_repository(self.local_path)
+            self._git_repo = None
+
             # Clone the repository
-            git_url = f"https://git.overleaf.com/{self.project_id}"
+            git_url = self.git_url
             logger.info(f"Cloning repository from {git_url} to {self.local_path}")
+            empty = not any(self.local_path.iterdir())
+
+            # libgit2 can clone straight into an empty directory
+            if self.use_pygit2 and empty:
+                try:
+                    self._git_repo = clone_repository(git_url, self.local_path)
+                    self._git_initialized = True
+                    return True
+                except (pygit2.GitError, ValueError) as e:
+                    logger.info(f"In-process clone failed, falling back to git: {e}")
+
+            # Only fetch the latest commit, and only the blobs it checks out
+            if empty:
+                commands = [
+                    ["git", "clone", "--no-checkout", "--filter=blob:none",
+                     "--depth=1", git_url, str(self.local_path)],
+                    ["git", "checkout", "HEAD", "--", "."],
+                ]
+            else:
+                # Set the repository up around the existing files, which are
+                # kept as local changes
+                commands = [
+                    ["git", "init", "--initial-branch=master"],
+                    ["git", "remote", "add", "origin", git_url],
+                    ["git", "fetch", "--depth=1", "--filter=blob:none",
+                     "origin", "master"],
+                    ["git", "reset", "FETCH_HEAD"],
+                ]
+
             try:
-                # Create a temporary directory for cloning
-                temp_clone_dir = Path(tempfile.mkdtemp())
-
-                # Clone into the temporary directory
-                result = subprocess.run(
-                    ["git", "clone", git_url, str(temp_clone_dir)],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                )
-                logger.debug(f"Git clone output: {result.stdout}")
-
-                # Move .git directory from temp to target directory
-                temp_git_dir = temp_clone_dir / ".git"
-                if temp_git_dir.exists():
-                    # Move all content from temp_clone_dir to local_path
-                    for item in temp_clone_dir.iterdir():
-                        if item.name == ".git":
-                            # Move the .git directory
-                            shutil.copytree(item, self.local_path / ".git")
-                        else:
-                            # Move other files only if they don't exist in target
-                            dest_path = self.local_path / item.name
-                            if not dest_path.exists():
-                                if item.is_dir():
-                                    shutil.copytree(item, dest_path)
-                                else:
-                                    shutil.copy2(item, dest_path)
-
-                    # Clean up temporary directory
-                    shutil.rmtree(temp_clone_dir)
-
-                    # Set up git config in the local repo
-                    subprocess.run(
-                        ["git", "config", "core.sparsecheckout", "true"],
+                for cmd in commands:
+                    result = subprocess.run(
+                        cmd,
                         cwd=self.local_path,
                         check=True,
                         capture_output=True,
+                        text=True,
                     )
+                    logger.debug(f"Git output: {result.stdout}")
 
-                    return True
-                else:
-                    logger.error("Git directory not found in cloned repository")
-                    return False
+                if not empty:
+                    # Check out the files that do not exist locally yet
+                    missing = subprocess.run(
+                        ["git", "ls-files", "-z", "--deleted"],
+                        cwd=self.local_path,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    ).stdout
+                    if missing:
+                        subprocess.run(
+                            ["git", "checkout-index", "-z", "--stdin"],
+                            cwd=self.local_path,
+                            input=missing,
+                            check=True,
+                            capture_output=True,
+                            text=True,
+                        )
+
+                self._git_initialized = True
+                return True
 
             except subprocess.CalledProcessError as e:
+                # Do not leave a half-initialized repository behind
+                shutil.rmtree(git_dir, ignore_errors=True)
                 logger.error(f"Git clone failed: {e}")
                 logger.error(
                     f"Error output: {e.stderr if hasattr(e, 'stderr') else 'No error output'}"
@@ -279,6 +574,8 @@ class Project:
                         )
 
                 return False
+
+        self._git_initialized = True
         return True
 
     def get_file(self, path: Union[str, Path]) -> Optional[File]:
@@ -291,11 +588,12 @@ class Project:
         Returns:
             Optional[File]: File object if found, None otherwise.
         """
-        path_str = str(path)
-        for file in self.files:
-            if str(file.relative_path) == path_str:
-                return file
-        return None
+        if self._files is None:
+            self._load_files()
+        relative_path = str(Path(path))
+        if relative_path not in self._files:
+            return None
+        return self._file(relative_path)
 
     def create_file(self, path: Union[str, Path], content: str = "") -> File:
         """
@@ -314,11 +612,12 @@ class Project:
 
         with open(abs_path, "w", encoding="utf-8") as f:
             f.write(content)
+        self.mark_dirty(rel_path)
 
         file = File(abs_path, rel_path, self)
 
         if self._files is not None:
-            self._files.append(file)
+            self._files[str(rel_path)] = file
 
         return file
 
@@ -336,8 +635,9 @@ class Project:
         if file:
             try:
                 file.path.unlink()
+                self.mark_dirty(file.relative_path)
                 if self._files is not None:
-                    self._files.remove(file)
+                    del self._files[str(file.relative_path)]
                 return True
             except OSError:
                 return False
@@ -16,9 +16,9 @@ Example:
 
 import argparse
 import difflib
-import os
+import itertools
+import subprocess
 import sys
-import time
 import threading
 from datetime import datetime
 from pathlib import Path
@@ -27,8 +27,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from overphloem.core.events import Event, on
+from overphloem.core.git import open_repository, pygit2
 from overphloem.core.project import Project
 
+# Errors raised by in-process git operations, when pygit2 is installed
+GIT_ERRORS = (pygit2.GitError,) if pygit2 is not None else ()
+
 
 def parse_args():
     """Parse command line arguments."""
@@ -48,8 +52,105 @@ def parse_args():
     return parser.parse_args()
 
 
+class BlobReader:
+    """Read git blobs through one long-running `git cat-file --batch` process."""
+
+    def __init__(self, repo_path):
+        """Start the cat-file process.
+
+        Args:
+            repo_path (Path): Path to the repository working tree
+        """
+        self.repo_path = Path(repo_path)
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, oid):
+        """Read the contents of a blob.
+
+        Args:
+            oid (str): Object ID of the blob
+
+        Returns:
+            bytes: Contents of the blob
+
+        Raises:
+            KeyError: If the object does not exist
+        """
+        with self._lock:
+            self._process.stdin.write(f"{oid}\n".encode())
+            self._process.stdin.flush()
+
+            # Header is "<oid> <type> <size>", or "<oid> missing"
+            header = self._process.stdout.readline().split()
+            if len(header) != 3:
+                raise KeyError(oid)
+
+            data = self._process.stdout.read(int(header[2]))
+            self._process.stdout.read(1)  # Trailing newline
+            return data
+
+    def close(self):
+        """Stop the cat-file process."""
+        self._process.stdin.close()
+        self._process.wait()
+
+
+def list_tree(repo_path, repo=None):
+    """List the blobs in the HEAD commit of a repository.
+
+    Args:
+        repo_path (Path): Path to the repository working tree
+        repo (pygit2.Repository): Open repository to walk in-process, or None
+            to run `git ls-tree`
+
+    Returns:
+        dict: Mapping of file path to blob object ID
+    """
+    if repo is not None:
+        oids = {}
+        stack = [("", repo.head.peel(pygit2.Commit).tree)]
+        while stack:
+            prefix, tree = stack.pop()
+            for entry in tree:
+                if entry.type_str == "tree":
+                    stack.append((f"{prefix}{entry.name}/", entry))
+                elif entry.type_str == "blob":
+                    oids[prefix + entry.name] = str(entry.id)
+        return oids
+
+    result = subprocess.run(
+        ["git", "ls-tree", "-r", "-z", "HEAD"],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    oids = {}
+    for entry in result.stdout.split("\0"):
+        if not entry:
+            continue
+        # Entries are "<mode> <type> <oid>\t<path>"
+        info, path = entry.split("\t", 1)
+        _, object_type, oid = info.split()
+        if object_type == "blob":
+            oids[path] = oid
+    return oids
+
+
 class ChangeMonitor:
-    """Monitor changes in an Overleaf project."""
+    """Monitor changes in an Overleaf project.
+
+    Changes are found by comparing the blob IDs in the HEAD tree after each
+    pull. Only blob IDs are kept between checks; contents are read from the
+    repository, and only when a verbose report needs them. With pygit2 all of
+    this happens in-process, otherwise through long-running git commands.
+    """
 
     def __init__(self, project_id, interval=30, verbose=False):
         """Initialize the change monitor.
@@ -62,7 +163,7 @@ class ChangeMonitor:
         self.project_id = project_id
         self.interval = interval
         self.verbose = verbose
-        self.file_states = {}
+        self.oid_states = {}
         self.stop_event = threading.Event()
 
         # Initialize the project
@@ -77,17 +178,66 @@ class ChangeMonitor:
             sys.exit(1)
 
         print(f"Successfully initialized project {project_id}")
+        self._blobs = None
         self._store_initial_file_states()
 
+    def _repository(self, repo_path):
+        """Get the shared libgit2 handle for a repository, if pygit2 is used.
+
+        Args:
+            repo_path (Path): Path to the repository working tree
+
+        Returns:
+            pygit2.Repository: The repository, or None to use git commands
+        """
+        if not self.project.use_pygit2:
+            return None
+        try:
+            return open_repository(repo_path)
+        except GIT_ERRORS:
+            return None
+
+    def _blob_reader(self, repo_path):
+        """Get the blob reader for a repository, starting it if needed.
+
+        Args:
+            repo_path (Path): Path to the repository working tree
+
+        Returns:
+            BlobReader: Reader for the repository's objects
+        """
+        if self._blobs is None or self._blobs.repo_path != Path(repo_path):
+            if self._blobs is not None:
+                self._blobs.close()
+            self._blobs = BlobReader(repo_path)
+        return self._blobs
+
+    def _read_blob(self, repo_path, path, oid):
+        """Read a blob as text.
+
+        Args:
+            repo_path (Path): Path to the repository working tree
+            path (str): Path of the file, for warnings
+            oid (str): Object ID of the blob
+
+        Returns:
+            str: Contents of the blob, or None if it could not be read
+        """
+        try:
+            repo = self._repository(repo_path)
+            if repo is not None:
+                data = repo[oid].data
+            else:
+                data = self._blob_reader(repo_path).read(oid)
+        except Exception as e:
+            print(f"Warning: Could not read file {path}: {e}")
+            return None
+        return data.decode("utf-8", errors="replace")
+
     def _store_initial_file_states(self):
         """Store the initial state of all files in the project."""
-        for file in self.project.files:
-            if file.path.is_file():
-                try:
-                    with open(file.path, "r", encoding="utf-8", errors="replace") as f:
-                        self.file_states[str(file.relative_path)] = f.read()
-                except Exception as e:
-                    print(f"Warning: Could not read file {file.relative_path}: {e}")
+        repo_path = self.project.local_path
+        self.oid_states = list_tree(repo_path, self._repository(repo_path))
 
     def _find_changes(self, project):
         """Find changes in the project files.
@@ -95,7 +245,7 @@ class ChangeMonitor:
         Returns:
             tuple: (changed_files, new_files, deleted_files)
             where:
-                changed_files: list of (path, old_content, new_content) tuples
+                changed_files: list of (path, old_oid, new_oid) tuples
                 new_files: list of file paths
                 deleted_files: list of file paths
         """
@@ -103,57 +253,92 @@ class ChangeMonitor:
         new_files = []
         deleted_files = []
 
+        try:
+            current_oids = list_tree(
+                project.local_path, self._repository(project.local_path)
+            )
+        except (subprocess.CalledProcessError, *GIT_ERRORS) as e:
+            print(f"Warning: Could not list project files: {e}")
+            return changed_files, new_files, deleted_files
+
         # Check for modified and new files
-        for file in project.files:
-            if file.path.is_file():
-                rel_path = str(file.relative_path)
-                try:
-                    with open(file.path, "r", encoding="utf-8", errors="replace") as f:
-                        current_content = f.read()
-
-                    if rel_path in self.file_states:
-                        # Check if file was modified
-                        if current_content != self.file_states[rel_path]:
-                            changed_files.append(
-                                (rel_path, self.file_states[rel_path], current_content)
-                            )
-                            self.file_states[rel_path] = current_content
-                    else:
-                        # New file
-                        new_files.append(rel_path)
-                        self.file_states[rel_path] = current_content
-                except Exception as e:
-                    print(f"Warning: Could not read file {rel_path}: {e}")
-
-        # Check for deleted files
-        for path in list(self.file_states.keys()):
-            if not (project.local_path / path).exists():
-                deleted_files.append(path)
-                del self.file_states[path]
+        for rel_path, oid in current_oids.items():
+            old_oid = self.oid_states.get(rel_path)
+            if oid == old_oid:
+                continue
+
+            if old_oid is not None:
+                changed_files.append((rel_path, old_oid, oid))
+            else:
+                new_files.append(rel_path)
+
+        # Deleted files are the ones missing from the new tree
+        deleted_files = sorted(self.oid_states.keys() - current_oids.keys())
 
+        self.oid_states = current_oids
         return changed_files, new_files, deleted_files
 
-    def _print_diff(self, old_content, new_content):
-        """Print a colored diff of the content changes."""
-        diff = difflib.unified_diff(
-            old_content.splitlines(),
-            new_content.splitlines(),
-            lineterm="",
-            n=3,  # Context lines
+    def _diff_lines(self, repo_path, path, old_oid, new_oid):
+        """Diff two blobs, preferring libgit2 or git over difflib.
+
+        Args:
+            repo_path (Path): Path to the repository working tree
+            path (str): Path of the file, for warnings
+            old_oid (str): Object ID of the old blob
+            new_oid (str): Object ID of the new blob
+
+        Returns:
+            iterator: Unified diff lines, starting at the first hunk header
+        """
+        try:
+            repo = self._repository(repo_path)
+            if repo is not None:
+                text = repo[old_oid].diff(repo[new_oid]).text
+            else:
+                text = subprocess.run(
+                    ["git", "diff", "--no-color", "--unified=3", old_oid, new_oid],
+                    cwd=repo_path,
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                    errors="replace",
+                ).stdout
+        except (OSError, subprocess.CalledProcessError, KeyError, *GIT_ERRORS):
+            old_content = self._read_blob(repo_path, path, old_oid)
+            new_content = self._read_blob(repo_path, path, new_oid)
+            if old_content is None or new_content is None:
+                return iter(())
+            diff = difflib.unified_diff(
+                old_content.splitlines(),
+                new_content.splitlines(),
+                lineterm="",
+                n=3,  # Context lines
+            )
+            return itertools.islice(diff, 2, None)  # Skip the file path lines
+
+        # Skip the "diff --git", "index", "---" and "+++" header lines
+        return itertools.dropwhile(
+            lambda line: not line.startswith("@@"), text.splitlines()
         )
 
-        diff_text = "\n".join(list(diff)[2:])  # Skip the file path lines
-        if diff_text:
-            for line in diff_text.splitlines():
-                if line.startswith("+"):
-                    print(f"    \033[92m{line}\033[0m")  # Green for additions
-                elif line.startswith("-"):
-                    print(f"    \033[91m{line}\033[0m")  # Red for deletions
-                elif line.startswith("@@"):
-                    print(f"    \033[94m{line}\033[0m")  # Blue for section headers
-                else:
-                    print(f"    {line}")
-            print()
+    def _print_diff(self, repo_path, path, old_oid, new_oid):
+        """Print a colored diff of the content changes."""
+        buf = []
+        for line in self._diff_lines(repo_path, path, old_oid, new_oid):
+            if line.startswith("+"):
+                buf.append(f"    \033[92m{line}\033[0m\n")  # Green for additions
+            elif line.startswith("-"):
+                buf.append(f"    \033[91m{line}\033[0m\n")  # Red for deletions
+            elif line.startswith("@@"):
+                buf.append(f"    \033[94m{line}\033[0m\n")  # Blue for section headers
+            else:
+                buf.append(f"    {line}\n")
+
+        # One write for the whole diff instead of a print per line
+        if buf:
+            buf.append("\n")
+            sys.stdout.write("".join(buf))
+            sys.stdout.flush()
 
     @on(Event.CHANGE, "placeholder", interval=1)  # Will be replaced at runtime
     def on_change(self, project):
@@ -167,12 +352,12 @@ class ChangeMonitor:
 
         if changed_files:
             print(f"\nModified files ({len(changed_files)}):")
-            for path, old_content, new_content in changed_files:
+            for path, old_oid, new_oid in changed_files:
                 print(f"  - {path}")
 
                 # Show diff in verbose mode
                 if self.verbose:
-                    self._print_diff(old_content, new_content)
+                    self._print_diff(project.local_path, path, old_oid, new_oid)
 
         if new_files:
             print(f"\nNew files ({len(new_files)}):")
@@ -180,13 +365,17 @@ class ChangeMonitor:
                 print(f"  + {path}")
 
                 # Show content in verbose mode
-                if self.verbose and path in self.file_states:
+                content = None
+                if self.verbose:
+                    content = self._read_blob(
+                        project.local_path, path, self.oid_states[path]
+                    )
+                if content is not None:
+                    lines = content.splitlines()
                     print("    Content:")
-                    for line_num, line in enumerate(
-                        self.file_states[path].splitlines()[:10]
-                    ):
+                    for line_num, line in enumerate(lines[:10]):
                         print(f"    {line_num+1:4d}: {line}")
-                    if len(self.file_states[path].splitlines()) > 10:
+                    if len(lines) > 10:
                         print("    ... (content truncated)")
                     print()
 
@@ -215,12 +404,13 @@ class ChangeMonitor:
         print("Press Ctrl+C to stop")
 
         try:
-            # Keep main thread alive
-            while not self.stop_event.is_set():
-                time.sleep(1)
+            # Block until interrupted
+            self.stop_event.wait()
         except KeyboardInterrupt:
             print("\nStopping monitoring...")
             self.stop_event.set()
+            if self._blobs is not None:
+                self._blobs.close()
 
 
 def main():
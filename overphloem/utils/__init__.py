@@ -6,7 +6,8 @@ from overphloem.utils.utils import (
     validate_project_id,
     find_tex_files,
     extract_tex_commands,
-    get_bibtex_entries
+    get_bibtex_entries,
+    walk_files,
 )
 
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     "validate_project_id",
     "find_tex_files",
     "extract_tex_commands",
-    "get_bibtex_entries"
+    "get_bibtex_entries",
+    "walk_files",
 ]
\ No newline at end of file
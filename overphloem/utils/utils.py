@@ -3,10 +3,26 @@ Utility functions for overphloem.
 """
 import os
 import re
+import fnmatch
 import logging
-from typing import List, Dict, Optional, Any
+from functools import cache, lru_cache
+from typing import List, Dict, Optional, Iterable, Iterator, Pattern, Tuple, Union
 from pathlib import Path
 
+# Names skipped by walk_files unless other patterns are given
+DEFAULT_IGNORE = (".git",)
+
+# Most Overleaf project IDs are hexadecimal strings
+_PROJECT_ID_RE = re.compile(r'^[a-zA-Z0-9]{10,24}$')
+
+# Start of a BibTeX entry, capturing its type and key
+_ENTRY_RE = re.compile(r'@(\w+)\s*\{\s*([^,\s]+)\s*,')
+
+# Start of a BibTeX field, capturing its name; the value follows
+_FIELD_RE = re.compile(r'(\w+)\s*=\s*')
+_BARE_VALUE_RE = re.compile(r'[^,\n}]*')
+_BRACE_RE = re.compile(r'[{}]')
+
 
 def setup_logging(level: int = logging.INFO) -> logging.Logger:
     """
@@ -47,21 +63,89 @@ def validate_project_id(project_id: str) -> bool:
     Returns:
         bool: True if the project ID is valid, False otherwise.
     """
-    # Most Overleaf project IDs are hexadecimal strings
-    return bool(re.match(r'^[a-zA-Z0-9]{10,24}$', project_id))
+    return bool(_PROJECT_ID_RE.match(project_id))
+
+
+@cache
+def _ignore_regex(patterns: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """
+    Compile glob patterns into a single regular expression.
+
+    Args:
+        patterns (Tuple[str, ...]): Glob patterns, as accepted by fnmatch.
+
+    Returns:
+        Optional[Pattern[str]]: Regex matching any of the patterns, or None
+        if there are no patterns.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def walk_files(directory: Union[str, Path],
+               ignore: Iterable[str] = DEFAULT_IGNORE) -> Iterator[os.DirEntry]:
+    """
+    Recursively list the files in a directory.
+
+    Uses ``os.scandir`` so file types (and later ``stat`` calls) come from the
+    directory entries instead of a separate syscall per path. Symbolic links
+    to files are listed like ``Path.rglob`` would, but symbolic links to
+    directories are not descended into.
+
+    Args:
+        directory (Union[str, Path]): Directory to walk.
+        ignore (Iterable[str], optional): Glob patterns for file and directory
+            names to skip; ignored directories are not descended into.
+            Defaults to DEFAULT_IGNORE.
+
+    Yields:
+        os.DirEntry: Entry for each regular file, or symbolic link to one.
+    """
+    regex = _ignore_regex(tuple(ignore))
+    stack = [os.fspath(directory)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if regex is not None and regex.match(entry.name):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
 
 
 def find_tex_files(directory: Path) -> List[Path]:
     """
     Find all TeX files in a directory.
 
+    Matches on the entry names from ``walk_files`` rather than globbing, and
+    does not descend into ``.git``.
+
     Args:
         directory (Path): Directory to search.
 
     Returns:
         List[Path]: List of paths to TeX files.
     """
-    return list(directory.glob("**/*.tex"))
+    return [
+        Path(entry.path) for entry in walk_files(directory)
+        if entry.name.endswith(".tex")
+    ]
+
+
+@lru_cache(maxsize=256)
+def _command_regex(command: str) -> Pattern[str]:
+    """
+    Compile the regular expression matching a TeX command's argument.
+
+    Args:
+        command (str): LaTeX command name (without backslash).
+
+    Returns:
+        Pattern[str]: Regex capturing the command's braced argument.
+    """
+    return re.compile(r'\\' + re.escape(command) + r'\{([^}]*)\}')
 
 
 def extract_tex_commands(content: str, command: str) -> List[str]:
@@ -75,8 +159,56 @@ def extract_tex_commands(content: str, command: str) -> List[str]:
     Returns:
         List[str]: List of command arguments.
     """
-    pattern = r'\\' + command + r'\{([^}]*)\}'
-    return re.findall(pattern, content)
+    return _command_regex(command).findall(content)
+
+
+def _closing_brace(text: str, start: int, end: int) -> int:
+    """
+    Find the brace closing the one at start, allowing nesting to any depth.
+
+    Args:
+        text (str): BibTeX content.
+        start (int): Index of the opening brace.
+        end (int): Index to stop searching at.
+
+    Returns:
+        int: Index of the closing brace, or end if the braces are unbalanced.
+    """
+    depth = 0
+    for brace in _BRACE_RE.finditer(text, start, end):
+        depth += 1 if brace.group() == "{" else -1
+        if depth == 0:
+            return brace.start()
+    return end
+
+
+def _bibtex_value(text: str, start: int, end: int) -> Tuple[str, int]:
+    """
+    Read a BibTeX field value, without its surrounding braces or quotes.
+
+    Braced values may nest braces to any depth.
+
+    Args:
+        text (str): BibTeX content.
+        start (int): Index where the value starts.
+        end (int): Index where the entry ends.
+
+    Returns:
+        Tuple[str, int]: The value and the index just after it.
+    """
+    if text.startswith("{", start, end):
+        # Unbalanced braces run to the end of the entry
+        stop = _closing_brace(text, start, end)
+        return text[start + 1:stop], min(stop + 1, end)
+
+    if text.startswith('"', start, end):
+        stop = text.find('"', start + 1, end)
+        if stop < 0:
+            return text[start + 1:end], end
+        return text[start + 1:stop], stop + 1
+
+    bare = _BARE_VALUE_RE.match(text, start, end)
+    return bare.group().strip(), bare.end()
 
 
 def get_bibtex_entries(bib_content: str) -> Dict[str, Dict[str, str]]:
@@ -90,36 +222,26 @@ def get_bibtex_entries(bib_content: str) -> Dict[str, Dict[str, str]]:
         Dict[str, Dict[str, str]]: Dictionary of BibTeX entries.
     """
     entries = {}
-    current_entry = None
-    current_key = None
-
-    for line in bib_content.split('\n'):
-        line = line.strip()
-
-        # Start of new entry
-        if line.startswith('@'):
-            match = re.match(r'@(\w+)\{([^,]+),', line)
-            if match:
-                entry_type, key = match.groups()
-                current_entry = {'type': entry_type}
-                current_key = key
-                entries[key] = current_entry
-
-        # Entry field
-        elif current_entry is not None and '=' in line:
-            field, value = line.split('=', 1)
-            field = field.strip().lower()
-            value = value.strip()
-
-            # Remove trailing comma
-            if value.endswith(','):
-                value = value[:-1]
-
-            # Remove surrounding braces or quotes
-            if (value.startswith('{') and value.endswith('}')) or \
-               (value.startswith('"') and value.endswith('"')):
-                value = value[1:-1]
-
-            current_entry[field] = value
-
-    return entries
\ No newline at end of file
+    matches = list(_ENTRY_RE.finditer(bib_content))
+
+    for i, match in enumerate(matches):
+        entry_type, key = match.groups()
+        entry = {'type': entry_type}
+
+        # The entry's fields run until its closing brace, so @string,
+        # @comment and free text between entries are not read as fields. An
+        # unclosed entry runs until the next one starts.
+        limit = matches[i + 1].start() if i + 1 < len(matches) else len(bib_content)
+        brace = bib_content.index("{", match.start())
+        end = _closing_brace(bib_content, brace, limit)
+        pos = match.end()
+        while True:
+            field = _FIELD_RE.search(bib_content, pos, end)
+            if field is None:
+                break
+            value, pos = _bibtex_value(bib_content, field.end(), end)
+            entry[field.group(1).lower()] = value
+
+        entries[key] = entry
+
+    return entries
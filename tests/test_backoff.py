@@ -0,0 +1,66 @@
+"""
+Test file for the backoff module.
+"""
+import unittest
+import threading
+from unittest.mock import patch
+
+from overphloem.core.backoff import AdaptiveInterval
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    """Test cases for the AdaptiveInterval class."""
+
+    def test_init(self):
+        """Test AdaptiveInterval initialization."""
+        backoff = AdaptiveInterval(30, falloff=1.5, jitter=0)
+
+        self.assertEqual(backoff.min_s, 30)
+        self.assertEqual(backoff.max_s, 3600)
+        self.assertEqual(backoff.current, 30)
+        self.assertEqual(backoff.delay, 30)
+
+    def test_tick_falloff(self):
+        """Test tick grows the interval on quiet checks and resets on events."""
+        backoff = AdaptiveInterval(10, max_s=50, falloff=2, jitter=0)
+
+        self.assertEqual(backoff.tick(False), 20)
+        self.assertEqual(backoff.tick(False), 40)
+
+        # Interval is capped at max_s
+        self.assertEqual(backoff.tick(False), 50)
+        self.assertEqual(backoff.tick(False), 50)
+
+        # Interval resets after an event
+        self.assertEqual(backoff.tick(True), 10)
+
+    def test_tick_without_falloff(self):
+        """Test tick keeps a fixed interval when falloff is None."""
+        backoff = AdaptiveInterval(10, jitter=0)
+
+        self.assertEqual(backoff.tick(False), 10)
+        self.assertEqual(backoff.tick(True), 10)
+
+    @patch('overphloem.core.backoff.random.uniform', return_value=1.1)
+    def test_jitter(self, mock_uniform):
+        """Test jitter is applied to the delay but not the interval."""
+        backoff = AdaptiveInterval(10, falloff=2, jitter=0.1)
+
+        self.assertAlmostEqual(backoff.tick(False), 22)
+        self.assertEqual(backoff.current, 20)
+        mock_uniform.assert_called_with(0.9, 1.1)
+
+    def test_sleep(self):
+        """Test sleep returns early once the stop event is set."""
+        backoff = AdaptiveInterval(60, jitter=0)
+        stop_event = threading.Event()
+        stop_event.set()
+
+        self.assertTrue(backoff.sleep(stop_event))
+
+        backoff = AdaptiveInterval(0.01, jitter=0)
+        self.assertFalse(backoff.sleep(threading.Event()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,32 @@
 """
 Test file for the CLI module.
 """
+import argparse
+import hashlib
+import itertools
+import os
+import threading
+import types
 import unittest
 import sys
-from unittest.mock import patch, MagicMock
+import tempfile
+from unittest.mock import patch, MagicMock, mock_open
 from io import StringIO
+from pathlib import Path
 
+from overphloem.core.index import FileIndex
 from overphloem.cli.cli import (
     create_parser,
     pull_command,
     push_command,
     attach_command,
-    main
+    listen_command,
+    main,
+    _cache_path,
+    _file_digest,
+    _is_network_fs,
+    _print_diff,
+    _read_with_digest,
 )
 
 
@@ -34,7 +49,7 @@ class TestCLI(unittest.TestCase):
         self.assertIn("push", commands)
         self.assertIn("attach", commands)
 
-    @patch('overphloem.cli.cli.Project')
+    @patch('overphloem.core.project.Project')
     def test_pull_command(self, mock_project_class):
         """Test pull_command function."""
         # Set up mocks
@@ -65,7 +80,7 @@ class TestCLI(unittest.TestCase):
             self.assertEqual(result, 1)
             self.assertIn("Failed to pull", output)
 
-    @patch('overphloem.cli.cli.Project')
+    @patch('overphloem.core.project.Project')
     def test_push_command(self, mock_project_class):
         """Test push_command function."""
         # Set up mocks
@@ -115,6 +130,65 @@ class TestCLI(unittest.TestCase):
             self.assertEqual(result, 1)
             self.assertIn("does not exist", output)
 
+    def test_cache_path(self):
+        """Test _cache_path function."""
+        with patch.dict('os.environ', {"XDG_CACHE_HOME": "/tmp/cache"}):
+            self.assertEqual(
+                str(_cache_path("test_project")), "/tmp/cache/overphloem/test_project"
+            )
+
+        with patch.dict('os.environ', {"XDG_CACHE_HOME": ""}), \
+                patch('pathlib.Path.home', return_value=Path("/home/user")):
+            self.assertEqual(
+                str(_cache_path("test_project")),
+                "/home/user/.cache/overphloem/test_project",
+            )
+
+    def test_file_digest(self):
+        """Test _file_digest matches hashing the contents in memory."""
+        data = b"\\section{Intro}\n" * 10000
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+
+            self.assertEqual(
+                _file_digest(f.name), hashlib.blake2b(data, digest_size=16).digest()
+            )
+            self.assertEqual(_read_with_digest(f.name), (data, _file_digest(f.name)))
+
+    def test_print_diff(self):
+        """Test _print_diff function."""
+        old_lines = ("line 1", "line 2", "line 3")
+        new_lines = ("line 1", "line two", "line 3")
+
+        with patch('sys.stdout', new=StringIO()) as fake_stdout:
+            _print_diff(old_lines, new_lines)
+
+            # No colors when stdout is not a terminal
+            self.assertEqual(
+                fake_stdout.getvalue(),
+                "    @@ -1,3 +1,3 @@\n"
+                "     line 1\n"
+                "    -line 2\n"
+                "    +line two\n"
+                "     line 3\n"
+                "\n",
+            )
+
+        with patch('sys.stdout', new=StringIO()) as fake_stdout:
+            fake_stdout.isatty = lambda: True
+            _print_diff(old_lines, new_lines)
+
+            output = fake_stdout.getvalue()
+            self.assertIn("    \033[91m-line 2\033[0m\n", output)
+            self.assertIn("    \033[92m+line two\033[0m\n", output)
+            self.assertIn("    \033[94m@@ -1,3 +1,3 @@\033[0m\n", output)
+
+        # Identical content prints nothing
+        with patch('sys.stdout', new=StringIO()) as fake_stdout:
+            _print_diff(old_lines, old_lines)
+            self.assertEqual(fake_stdout.getvalue(), "")
+
     @patch('overphloem.cli.cli.create_parser')
     def test_main(self, mock_create_parser):
         """Test main function."""
@@ -122,40 +196,357 @@ class TestCLI(unittest.TestCase):
         mock_parser = MagicMock()
         mock_create_parser.return_value = mock_parser
 
-        # Test pull command
+        # Test each command dispatches to its handler
         mock_args = MagicMock()
-        mock_args.command = "pull"
         mock_parser.parse_args.return_value = mock_args
 
-        with patch('overphloem.cli.cli.pull_command', return_value=0) as mock_pull:
-            result = main()
-            self.assertEqual(result, 0)
-            mock_pull.assert_called_once_with(mock_args)
-
-        # Test push command
-        mock_args.command = "push"
+        for command in (pull_command, push_command, attach_command):
+            handler = MagicMock(return_value=0)
+            mock_args.func = handler
 
-        with patch('overphloem.cli.cli.push_command', return_value=0) as mock_push:
             result = main()
             self.assertEqual(result, 0)
-            mock_push.assert_called_once_with(mock_args)
+            handler.assert_called_once_with(mock_args)
 
-        # Test attach command
-        mock_args.command = "attach"
-
-        with patch('overphloem.cli.cli.attach_command', return_value=0) as mock_attach:
-            result = main()
-            self.assertEqual(result, 0)
-            mock_attach.assert_called_once_with(mock_args)
-
-        # Test invalid command
-        mock_args.command = None
+        # Test missing command
+        mock_args.func = None
 
         with patch('sys.stdout', new=StringIO()):
             result = main()
             self.assertEqual(result, 1)
             mock_parser.print_help.assert_called_once()
 
+    def test_parser_dispatch(self):
+        """Test sub-commands set their handler."""
+        parser = create_parser()
+
+        args = parser.parse_args(["pull", "--project-id", "test_project"])
+        self.assertIs(args.func, pull_command)
+
+        args = parser.parse_args(["listen", "--project-id", "test_project"])
+        self.assertIs(args.func, listen_command)
+
+        args = parser.parse_args([])
+        self.assertIsNone(getattr(args, "func", None))
+
+    def test_is_network_fs(self):
+        """Test _is_network_fs uses the longest matching mount."""
+        mounts = (
+            "/dev/sda1 / ext4 rw 0 0\n"
+            "server:/export /mnt/nfs nfs4 rw 0 0\n"
+            "/dev/sdb1 /mnt/nfs/local ext4 rw 0 0\n"
+            "server:/share /mnt/my\\040share cifs rw 0 0\n"
+            "sshfs#host: /mnt/remote fuse.sshfs rw 0 0\n"
+        )
+        with patch('builtins.open', mock_open(read_data=mounts)):
+            self.assertTrue(_is_network_fs(Path("/mnt/nfs/project")))
+            self.assertTrue(_is_network_fs(Path("/mnt/nfs")))
+            self.assertFalse(_is_network_fs(Path("/mnt/nfs/local/project")))
+            self.assertFalse(_is_network_fs(Path("/mnt/nfsother")))
+            self.assertFalse(_is_network_fs(Path("/home/user/project")))
+            self.assertTrue(_is_network_fs(Path("/mnt/my share/project")))
+            self.assertTrue(_is_network_fs(Path("/mnt/remote/project")))
+
+        # An unreadable mount table means notifications are used
+        with patch('builtins.open', side_effect=OSError):
+            self.assertFalse(_is_network_fs(Path("/mnt/nfs/project")))
+
+
+class TestAttachCommand(unittest.TestCase):
+    """Test cases for the attach command's monitoring loop."""
+
+    def setUp(self):
+        """Set up a working copy, a script and a mocked project."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "project"
+        self.root.mkdir()
+        with open(self.root / "main.tex", "w") as f:
+            f.write("hello")
+
+        # The script logs the changes it was given and writes an output file
+        self.log = Path(self.temp_dir.name) / "changes.log"
+        self.script = Path(self.temp_dir.name) / "script.sh"
+        with open(self.script, "w") as f:
+            f.write(
+                "#!/bin/sh\n"
+                f"printf '%s\\n--\\n' \"$OVERPHLOEM_CHANGES\" >> '{self.log}'\n"
+                "date +%N > output.txt\n"
+            )
+        os.chmod(self.script, 0o755)
+
+        self.project = MagicMock()
+        self.project.local_path = self.root
+        self.commit = "1"
+        self.done = threading.Event()
+
+        patchers = [
+            patch('overphloem.core.project.Project', return_value=self.project),
+            patch('overphloem.cli.cli._cache_path', return_value=self.root),
+            patch('overphloem.cli.cli._get_commit_hash',
+                  side_effect=lambda project: self.commit),
+            patch('overphloem.cli.cli._wait_for_interrupt', side_effect=self.wait),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def wait(self, stop_event, threads):
+        """Stand in for Ctrl+C once the test's changes were handled."""
+        self.assertTrue(self.done.wait(10))
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def test_script_output_not_reported(self):
+        """Test files written by the script do not trigger it again."""
+        pulls = itertools.count()
+
+        def pull():
+            # Pulls alternate between a new commit and the burst check that
+            # finds no further commits
+            n = next(pulls)
+            if n == 1:
+                with open(self.root / "main.tex", "w") as f:
+                    f.write("remote edit")
+                self.commit = "2"
+            elif n == 3:
+                self.commit = "3"
+            elif n > 4:
+                self.done.set()
+            return True
+
+        self.project.pull.side_effect = pull
+        args = argparse.Namespace(
+            project_id="test_project", script=str(self.script), on="change",
+            interval=0.01, falloff=None, push=False,
+        )
+        with patch('sys.stdout', new=StringIO()):
+            self.assertEqual(attach_command(args), 0)
+
+        with open(self.log) as f:
+            batches = f.read().split("\n--\n")[:-1]
+        self.assertEqual(batches, ["modified\tmain.tex", ""])
+
+    def test_initial_pull_failure(self):
+        """Test attach stops when the initial pull fails."""
+        self.project.pull.return_value = False
+        args = argparse.Namespace(
+            project_id="test_project", script=str(self.script), on="change",
+            interval=0.01, falloff=None, push=False,
+        )
+        with patch('sys.stdout', new=StringIO()) as fake_stdout:
+            self.assertEqual(attach_command(args), 1)
+
+        self.assertIn("Failed to pull project test_project", fake_stdout.getvalue())
+        self.assertFalse(self.log.exists())
+
+
+class TestListenCommand(unittest.TestCase):
+    """Test cases for change detection in the listen command."""
+
+    def setUp(self):
+        """Set up a working copy and a mocked project."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / ".git").mkdir()
+        self.write("modified.tex", "one\ntwo\n")
+        self.write("touched.tex", "same")
+        self.write("deleted.tex", "gone")
+
+        self.project = MagicMock()
+        self.project.local_path = self.root
+        self.project._init_git_repo.return_value = True
+        self.project.pull.return_value = True
+        self.commit = "1"
+        self.done = threading.Event()
+
+        patchers = [
+            patch('overphloem.core.project.Project', return_value=self.project),
+            patch('overphloem.cli.cli._get_commit_hash',
+                  side_effect=lambda project: self.commit),
+            patch('overphloem.cli.cli._wait_for_interrupt', side_effect=self.wait),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def write(self, rel_path, content):
+        """Write a file in the working copy."""
+        with open(self.root / rel_path, "w") as f:
+            f.write(content)
+
+    def wait(self, stop_event, threads):
+        """Stand in for Ctrl+C once the test's changes were reported."""
+        self.assertTrue(self.done.wait(10))
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def edit_files(self):
+        """Modify, touch, delete and add files in the working copy."""
+        self.write("modified.tex", "one\n2\n")
+        # Same content with a new mtime must not be reported
+        stat = os.stat(self.root / "touched.tex")
+        os.utime(self.root / "touched.tex",
+                 ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        os.remove(self.root / "deleted.tex")
+        self.write("added.tex", "new")
+
+    def run_listen(self, interval, verbose=True):
+        """Run the listen command until the test signals it is done."""
+        args = argparse.Namespace(
+            project_id="test_project", path=str(self.root),
+            interval=interval, falloff=None, verbose=verbose,
+        )
+        with patch('sys.stdout', new=StringIO()) as fake_stdout:
+            self.assertEqual(listen_command(args), 0)
+        return fake_stdout.getvalue()
+
+    def assert_reported(self, output):
+        """Check the changes made by edit_files were reported once each."""
+        report = output[output.index("Changes detected"):]
+        self.assertIn("Modified files (1):\n  - modified.tex\n", report)
+        self.assertIn("    -two\n    +2\n", report)
+        self.assertIn("New files (1):\n  + added.tex\n", report)
+        self.assertIn("Deleted files (1):\n  - deleted.tex\n", report)
+        self.assertNotIn("touched.tex", report)
+
+    def test_polling(self):
+        """Test changes are found by re-scanning after a new commit."""
+        pulls = itertools.count()
+
+        def pull():
+            # The first pull is listen's own, before the initial scan
+            n = next(pulls)
+            if n == 1:
+                self.edit_files()
+                self.commit = "2"
+            elif n > 1:
+                self.done.set()
+            return True
+
+        self.project.pull.side_effect = pull
+        # Without watchfiles the working copy is polled
+        with patch.dict(sys.modules, {"watchfiles": None}):
+            output = self.run_listen(interval=0.01)
+
+        self.assertIn("Monitoring for changes", output)
+        self.assert_reported(output)
+
+    def test_index_reused_across_runs(self):
+        """Test a restart only re-hashes files changed while it was stopped."""
+        self.project.pull.side_effect = lambda: self.done.set() or True
+        with patch.dict(sys.modules, {"watchfiles": None}):
+            self.run_listen(interval=0.01, verbose=False)
+
+            index = FileIndex.for_project(self.project)
+            self.assertEqual(
+                index.keys(), {"modified.tex", "touched.tex", "deleted.tex"}
+            )
+            index.close()
+
+            self.edit_files()
+            with patch('overphloem.cli.cli._file_digest',
+                       side_effect=_file_digest) as mock_digest:
+                self.run_listen(interval=0.01, verbose=False)
+
+        hashed = {call.args[0] for call in mock_digest.call_args_list}
+        self.assertEqual(
+            hashed,
+            {str(self.root / "modified.tex"), str(self.root / "touched.tex"),
+             str(self.root / "added.tex")},
+        )
+        index = FileIndex.for_project(self.project)
+        self.assertEqual(
+            index.keys(), {"modified.tex", "touched.tex", "added.tex"}
+        )
+        index.close()
+
+    def test_watcher(self):
+        """Test changes reported by filesystem notifications."""
+        def watch(root, stop_event, rust_timeout):
+            self.assertEqual(root, self.root.resolve())
+            self.edit_files()
+            yield {
+                (2, str(root / "modified.tex")),
+                (2, str(root / "touched.tex")),
+                (3, str(root / "deleted.tex")),
+                (1, str(root / "added.tex")),
+            }
+            self.done.set()
+            stop_event.wait()
+
+        watchfiles = types.SimpleNamespace(watch=watch)
+        with patch.dict(sys.modules, {"watchfiles": watchfiles}), \
+                patch('overphloem.cli.cli._is_network_fs', return_value=False), \
+                patch('overphloem.cli.cli._file_digest') as mock_digest:
+            output = self.run_listen(interval=3600)
+
+        # Verbose mode hashes the contents it reads for diffs
+        mock_digest.assert_not_called()
+
+        self.assertIn("Watching", output)
+        self.assert_reported(output)
+        # Pulls happen on their own schedule, not per notification
+        self.assertEqual(self.project.pull.call_count, 1)
+
+    def test_binary_change(self):
+        """Test a text file rewritten as binary is reported without a diff."""
+        def watch(root, stop_event, rust_timeout):
+            with open(root / "modified.tex", "wb") as f:
+                f.write(b"\x00\x01binary")
+            yield {(2, str(root / "modified.tex"))}
+            # Later changes are still reported
+            self.write("added.tex", "new")
+            yield {(1, str(root / "added.tex"))}
+            self.done.set()
+            stop_event.wait()
+
+        watchfiles = types.SimpleNamespace(watch=watch)
+        with patch.dict(sys.modules, {"watchfiles": watchfiles}), \
+                patch('overphloem.cli.cli._is_network_fs', return_value=False):
+            output = self.run_listen(interval=3600)
+
+        self.assertIn(
+            "Modified files (1):\n  - modified.tex\n    Binary file changed\n",
+            output,
+        )
+        self.assertIn("New files (1):\n  + added.tex\n", output)
+
+    def test_watcher_error(self):
+        """Test a failing batch of notifications does not stop the watcher."""
+        def watch(root, stop_event, rust_timeout):
+            self.write("first.tex", "first")
+            self.commit = None
+            yield {(1, str(root / "first.tex"))}
+            self.commit = "1"
+            self.write("second.tex", "second")
+            yield {(1, str(root / "second.tex"))}
+            self.done.set()
+            stop_event.wait()
+
+        def commit_hash(project):
+            if self.commit is None:
+                raise OSError("repository busy")
+            return self.commit
+
+        watchfiles = types.SimpleNamespace(watch=watch)
+        with patch.dict(sys.modules, {"watchfiles": watchfiles}), \
+                patch('overphloem.cli.cli._is_network_fs', return_value=False), \
+                patch('overphloem.cli.cli._get_commit_hash', side_effect=commit_hash):
+            output = self.run_listen(interval=3600)
+
+        self.assertIn("Error monitoring changes: repository busy", output)
+        self.assertIn("New files (1):\n  + second.tex\n", output)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Test file for the debounce module.
+"""
+import time
+import unittest
+import threading
+
+from overphloem.core.debounce import ADDED, DELETED, MODIFIED, Debouncer
+
+
+class TestDebouncer(unittest.TestCase):
+    """Test cases for the Debouncer class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.debouncer = Debouncer(window_ms=10)
+
+    def test_merge(self):
+        """Test events on the same path are merged."""
+        self.debouncer.push_many([
+            (ADDED, "new.tex"),
+            (MODIFIED, "new.tex"),
+            (MODIFIED, "main.tex"),
+            (MODIFIED, "main.tex"),
+            (ADDED, "temp.tex"),
+            (DELETED, "temp.tex"),
+            (MODIFIED, "old.tex"),
+            (DELETED, "old.tex"),
+            (DELETED, "replaced.tex"),
+            (ADDED, "replaced.tex"),
+        ])
+
+        self.assertEqual(self.debouncer.flush(), {
+            "new.tex": ADDED,
+            "main.tex": MODIFIED,
+            "old.tex": DELETED,
+            "replaced.tex": MODIFIED,
+        })
+
+    def test_flush_clears_batch(self):
+        """Test flush starts a new batch."""
+        self.debouncer.push(MODIFIED, "main.tex")
+        self.assertEqual(self.debouncer.flush(), {"main.tex": MODIFIED})
+        self.assertEqual(self.debouncer.flush(), {})
+
+    def test_flush_waits_for_quiet_window(self):
+        """Test flush waits until no events arrive for the window."""
+        debouncer = Debouncer(window_ms=100)
+        debouncer.push(MODIFIED, "main.tex")
+
+        def push_later():
+            time.sleep(0.05)
+            debouncer.push(ADDED, "new.tex")
+
+        thread = threading.Thread(target=push_later)
+        thread.start()
+        events = debouncer.flush()
+        thread.join()
+
+        self.assertEqual(events, {"main.tex": MODIFIED, "new.tex": ADDED})
+
+    def test_flush_stop_event(self):
+        """Test flush returns immediately once the stop event is set."""
+        debouncer = Debouncer(window_ms=60000)
+        debouncer.push(MODIFIED, "main.tex")
+        stop_event = threading.Event()
+        stop_event.set()
+
+        self.assertEqual(debouncer.flush(stop_event), {"main.tex": MODIFIED})
+
+
+if __name__ == "__main__":
+    unittest.main()
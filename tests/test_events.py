@@ -3,10 +3,13 @@ Test file for the events module.
 """
 import unittest
 import time
+import tempfile
 import threading
-from unittest.mock import patch, MagicMock, call
+from pathlib import Path
+from unittest.mock import patch, MagicMock
 
-from overphloem.core.events import Event, EventHandler, on
+from overphloem.core.backoff import AdaptiveInterval
+from overphloem.core.events import Event, EventHandler, ListenerState, _handler, on
 
 
 class TestEvents(unittest.TestCase):
@@ -16,10 +19,6 @@ class TestEvents(unittest.TestCase):
         """Set up test environment."""
         # Create a fresh event handler for each test
         self.handler = EventHandler()
-        # Clear existing listeners
-        for event in Event:
-            self.handler._listeners[event].clear()
-        self.handler._running_threads.clear()
 
     def test_event_enum(self):
         """Test Event enum values."""
@@ -28,9 +27,10 @@ class TestEvents(unittest.TestCase):
         self.assertEqual(Event.PUSH.value, "push")
 
     def test_handler_singleton(self):
-        """Test EventHandler is a singleton."""
-        handler1 = EventHandler()
-        handler2 = EventHandler()
+        """Test the global event handler is created once."""
+        handler1 = _handler()
+        handler2 = _handler()
+        self.assertIsInstance(handler1, EventHandler)
         self.assertIs(handler1, handler2)
 
     def test_register(self):
@@ -47,12 +47,13 @@ class TestEvents(unittest.TestCase):
         self.assertIn(listener_id, self.handler._listeners[Event.CHANGE])
         listener = self.handler._listeners[Event.CHANGE][listener_id]
 
-        self.assertEqual(listener["project_id"], project_id)
-        self.assertEqual(listener["callback"], callback)
-        self.assertTrue(listener["push"])
-        self.assertEqual(listener["interval"], 30)
-        self.assertEqual(listener["falloff"], 1.5)
-        self.assertEqual(listener["current_interval"], 30)
+        self.assertIsInstance(listener, ListenerState)
+        self.assertEqual(listener.project_id, project_id)
+        self.assertEqual(listener.callback, callback)
+        self.assertTrue(listener.push)
+        self.assertEqual(listener.interval, 30)
+        self.assertEqual(listener.falloff, 1.5)
+        self.assertEqual(listener.backoff.current, 30)
 
     def test_unregister(self):
         """Test unregister method."""
@@ -78,106 +79,115 @@ class TestEvents(unittest.TestCase):
         result = self.handler.unregister("non_existent")
         self.assertFalse(result)
 
-    @patch('overphloem.core.events.threading.Thread')
-    def test_start_change_thread(self, mock_thread):
-        """Test _start_change_thread method."""
-        listener_id = "test_listener"
-        project_id = "test_project"
-        interval = 30
-
-        self.handler._start_change_thread(listener_id, project_id, interval)
+    def _make_state(self, callback, interval=30, push=False):
+        """Create a listener state for tests."""
+        return ListenerState(
+            project_id="test_project",
+            callback=callback,
+            push=push,
+            interval=interval,
+            falloff=1.5,
+            last_check=time.time(),
+            backoff=AdaptiveInterval(interval, falloff=1.5),
+        )
 
-        # Check that thread was created and started
-        self.assertIn(listener_id, self.handler._running_threads)
-        self.assertFalse(self.handler._running_threads[listener_id]["stop"])
+    @patch('overphloem.core.events.threading.Thread')
+    def test_schedule_check(self, mock_thread):
+        """Test _schedule_check method."""
+        state = self._make_state(MagicMock())
+        self.handler._schedule_check("test_listener", state, 30)
+        self.handler._schedule_check("other_listener", state, 10)
 
+        # Check that the scheduler thread was created and started only once
         mock_thread.assert_called_once()
         mock_thread.return_value.start.assert_called_once()
 
+        # Check that the earliest check is at the top of the heap
+        self.assertEqual(len(self.handler._schedule), 2)
+        self.assertEqual(self.handler._schedule[0][2], "other_listener")
+
+    def test_scheduler_runs_due_checks(self):
+        """Test the scheduler only runs checks for registered listeners."""
+        checked = threading.Event()
+
+        with patch.object(self.handler, "_check_once",
+                          side_effect=lambda state: checked.set()) as mock_check:
+            listener_id = self.handler.register(
+                Event.CHANGE, "test_project", MagicMock(), interval=30
+            )
+            self.assertTrue(checked.wait(timeout=2))
+            state = self.handler._listeners[Event.CHANGE][listener_id]
+            mock_check.assert_called_with(state)
+
+            # Unregistered listeners are dropped when their check is due
+            self.handler.unregister(listener_id)
+            checked.clear()
+            self.handler._schedule_check(listener_id, state)
+            self.assertFalse(checked.wait(timeout=0.2))
+
     @patch('overphloem.core.events.Project')
     @patch('overphloem.core.events.EventHandler._get_latest_commit_hash')
-    def test_monitor_changes(self, mock_get_hash, mock_project_class):
-        """Test _monitor_changes method."""
+    def test_check_once(self, mock_get_hash, mock_project_class):
+        """Test _check_once method."""
         # Set up mocks
         mock_project = MagicMock()
         mock_project_class.return_value = mock_project
 
-        # Mock commit hashes (first same, then different to trigger callback)
-        mock_get_hash.side_effect = ["hash1", "hash1", "hash2"]
+        # Mock commit hashes (first same, then a burst of two new commits)
+        mock_get_hash.side_effect = ["hash1", "hash1", "hash2", "hash3", "hash3"]
 
-        # Set up listener data
         callback = MagicMock(return_value=True)
-        project_id = "test_project"
-
-        listener_id = f"{project_id}_change_{id(callback)}"
-        self.handler._listeners[Event.CHANGE][listener_id] = {
-            "project_id": project_id,
-            "callback": callback,
-            "push": True,
-            "interval": 1,  # 1 second for faster testing
-            "falloff": 1.5,
-            "current_interval": 1,
-            "last_check": time.time()
-        }
-
-        # Create thread data with stop flag
-        thread_data = {"stop": False}
-
-        # Run monitor_changes in a separate thread
-        thread = threading.Thread(
-            target=self.handler._monitor_changes,
-            args=(listener_id, thread_data)
-        )
-        thread.daemon = True
-        thread.start()
-
-        # Let it run for a bit
-        time.sleep(3)
-
-        # Stop the thread
-        thread_data["stop"] = True
-        thread.join(timeout=2)
-
-        # Check that project was pulled
-        mock_project.pull.assert_called()
-
-        # Check that callback was called when hash changed
-        callback.assert_called_with(mock_project)
+        state = self._make_state(callback, interval=1, push=True)
+
+        # The first check only pulls and records the commit hash
+        self.handler._check_once(state)
+        mock_project.pull.assert_called_once()
+        self.assertIs(state.project, mock_project)
+        self.assertEqual(state.last_commit_hash, "hash1")
+
+        # An unchanged hash backs off without calling back
+        self.handler._check_once(state)
+        callback.assert_not_called()
+        self.assertEqual(state.backoff.current, 1.5)
+
+        # New commits wait for the burst to end before calling back
+        self.handler._check_once(state)
+        self.handler._check_once(state)
+        callback.assert_not_called()
+        self.assertTrue(state.pending)
+
+        # Check that callback was called once the hash stopped changing
+        self.handler._check_once(state)
+        callback.assert_called_once_with(mock_project)
+        self.assertFalse(state.pending)
+        self.assertEqual(state.backoff.current, 1)
 
         # Check that push was called (since callback returns True)
-        mock_project.push.assert_called()
+        mock_project.push.assert_called_once()
 
-    @patch('subprocess.run')
-    def test_get_latest_commit_hash(self, mock_run):
+    def test_get_latest_commit_hash(self):
         """Test _get_latest_commit_hash method."""
-        # Mock successful git command
-        mock_run.return_value = MagicMock(
-            stdout="abcdef1234567890",
-            returncode=0
-        )
-
-        mock_project = MagicMock()
-        mock_project.local_path = "/tmp/test"
-
-        hash_value = self.handler._get_latest_commit_hash(mock_project)
-        self.assertEqual(hash_value, "abcdef1234567890")
-
-        # Check that git command was called
-        mock_run.assert_called_with(
-            ["git", "rev-parse", "HEAD"],
-            cwd=mock_project.local_path,
-            check=True,
-            capture_output=True,
-            text=True
-        )
-
-        # Test case where git command fails
-        mock_run.side_effect = Exception("Git error")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            git_dir = Path(temp_dir) / ".git"
+            (git_dir / "refs" / "heads").mkdir(parents=True)
+            with open(git_dir / "HEAD", "w") as f:
+                f.write("ref: refs/heads/master\n")
+            with open(git_dir / "refs" / "heads" / "master", "w") as f:
+                f.write("abcdef1234567890\n")
+
+            mock_project = MagicMock()
+            mock_project.local_path = temp_dir
+
+            hash_value = self.handler._get_latest_commit_hash(mock_project)
+            self.assertEqual(hash_value, "abcdef1234567890")
+
+        # Test case where there is no repository
+        mock_project.local_path = "/nonexistent/overphloem/test"
         hash_value = self.handler._get_latest_commit_hash(mock_project)
         self.assertEqual(hash_value, "")
 
-    @patch('overphloem.core.events._handler.register')
-    def test_on_decorator(self, mock_register):
+    @patch('overphloem.core.events._handler')
+    def test_on_decorator(self, mock_handler):
         """Test on decorator."""
 
         @on(Event.CHANGE, "test_project", push=True, interval=30, falloff=1.5)
@@ -185,7 +195,7 @@ class TestEvents(unittest.TestCase):
             return True
 
         # Check that register was called with correct args
-        mock_register.assert_called_with(
+        mock_handler.return_value.register.assert_called_with(
             Event.CHANGE, "test_project", test_callback, True, 30, 1.5
         )
 
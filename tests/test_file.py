@@ -3,6 +3,7 @@ Test file for the File class.
 """
 import os
 import unittest
+import unittest.mock
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -26,6 +27,7 @@ class TestFile(unittest.TestCase):
         # Create a mock project
         self.mock_project = MagicMock()
         self.mock_project.local_path = self.temp_path
+        self.mock_project._pending_writes = None
 
         # Create a File object
         self.relative_path = Path("test.tex")
@@ -74,6 +76,45 @@ class TestFile(unittest.TestCase):
         # Check that cached content was updated
         self.assertEqual(self.file._content, "Updated content")
 
+    def test_content_setter_unchanged(self):
+        """Test content setter skips the write when content is unchanged."""
+        self.assertEqual(self.file.content, "Test content")
+        mtime_ns = os.stat(self.test_file_path).st_mtime_ns
+
+        with unittest.mock.patch("builtins.open") as mock_open:
+            self.file.content = "Test content"
+            mock_open.assert_not_called()
+
+        self.assertEqual(os.stat(self.test_file_path).st_mtime_ns, mtime_ns)
+
+    def test_content_setter_after_external_change(self):
+        """Test content setter writes when the file changed since it was read."""
+        self.assertEqual(self.file.content, "Test content")
+
+        # E.g. a pull replacing the file
+        os.remove(self.test_file_path)
+        with open(self.test_file_path, "w") as f:
+            f.write("Pulled content")
+
+        self.file.content = "Test content"
+        with open(self.test_file_path, "r") as f:
+            self.assertEqual(f.read(), "Test content")
+
+    def test_content_setter_deferred(self):
+        """Test content setter defers the write inside a batch."""
+        self.mock_project._pending_writes = {}
+
+        self.file.content = "Deferred content"
+
+        # File is queued on the project but not written yet
+        self.assertIs(self.mock_project._pending_writes[self.test_file_path], self.file)
+        with open(self.test_file_path, "r") as f:
+            self.assertEqual(f.read(), "Test content")
+
+        self.file._write()
+        with open(self.test_file_path, "r") as f:
+            self.assertEqual(f.read(), "Deferred content")
+
     def test_is_tex(self):
         """Test is_tex method."""
         # Test .tex file
@@ -91,6 +132,10 @@ class TestFile(unittest.TestCase):
         """Test __repr__ method."""
         self.assertEqual(repr(self.file), "File(test.tex)")
 
+    def test_slots(self):
+        """Test File instances have no per-instance __dict__."""
+        self.assertFalse(hasattr(self.file, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
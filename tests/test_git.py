@@ -0,0 +1,144 @@
+"""
+Test file for the git helpers.
+"""
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from overphloem.core.git import (
+    forget_repository, head_commit, open_repository, pygit2, read_head
+)
+
+
+class TestGit(unittest.TestCase):
+    """Test cases for the git helpers."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.git_dir = self.temp_path / ".git"
+        (self.git_dir / "refs" / "heads").mkdir(parents=True)
+        self._write("HEAD", "ref: refs/heads/master\n")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        """Write a file inside the fake .git directory."""
+        with open(self.git_dir / name, "w") as f:
+            f.write(content)
+
+    def test_read_head_loose_ref(self):
+        """Test read_head with a loose branch ref."""
+        self._write("refs/heads/master", "1111111111111111111111111111111111111111\n")
+        self.assertEqual(
+            read_head(self.temp_path), "1111111111111111111111111111111111111111"
+        )
+
+        # New commits are picked up
+        self._write("refs/heads/master", "2222222222222222222222222222222222222222\n")
+        self.assertEqual(
+            read_head(self.temp_path), "2222222222222222222222222222222222222222"
+        )
+
+        # So is switching to another branch
+        self._write("refs/heads/other", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa\n")
+        self._write("HEAD", "ref: refs/heads/other\n")
+        self.assertEqual(
+            read_head(self.temp_path), "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+        )
+
+    def test_read_head_packed_ref(self):
+        """Test read_head with a ref stored in packed-refs."""
+        self._write(
+            "packed-refs",
+            "# pack-refs with: peeled fully-peeled sorted\n"
+            "3333333333333333333333333333333333333333 refs/heads/master\n"
+            "4444444444444444444444444444444444444444 refs/tags/v1\n"
+            "^5555555555555555555555555555555555555555\n",
+        )
+        self.assertEqual(
+            read_head(self.temp_path), "3333333333333333333333333333333333333333"
+        )
+
+        # Loose refs take precedence over packed ones
+        self._write("refs/heads/master", "6666666666666666666666666666666666666666\n")
+        self.assertEqual(
+            read_head(self.temp_path), "6666666666666666666666666666666666666666"
+        )
+
+        # Falls back to packed-refs again once the loose ref is gone
+        os.remove(self.git_dir / "refs" / "heads" / "master")
+        self.assertEqual(
+            read_head(self.temp_path), "3333333333333333333333333333333333333333"
+        )
+
+    def test_read_head_detached(self):
+        """Test read_head with a detached HEAD."""
+        self._write("HEAD", "7777777777777777777777777777777777777777\n")
+        self.assertEqual(
+            read_head(self.temp_path), "7777777777777777777777777777777777777777"
+        )
+
+    def test_read_head_missing(self):
+        """Test read_head without a resolvable HEAD."""
+        # Unborn branch
+        self.assertEqual(read_head(self.temp_path), "")
+
+        # No repository at all
+        self.assertEqual(read_head(self.temp_path / "missing"), "")
+
+    @unittest.skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_open_repository_cached(self):
+        """Test repository handles are shared per directory until forgotten."""
+        pygit2.init_repository(str(self.temp_path / "repo"))
+        path = self.temp_path / "repo"
+        self.addCleanup(forget_repository, path)
+
+        repo = open_repository(path)
+        self.assertIs(open_repository(self.temp_path / "repo" / ".." / "repo"), repo)
+        self.assertIs(open_repository(str(path)), repo)
+
+        forget_repository(path)
+        self.assertIsNot(open_repository(path), repo)
+
+    @patch('overphloem.core.git.pygit2', None)
+    def test_head_commit_reads_git_dir(self):
+        """Test head_commit without pygit2 reads the .git directory."""
+        self._write("refs/heads/master", "8888888888888888888888888888888888888888\n")
+
+        with patch('overphloem.core.git.subprocess.run') as mock_run:
+            self.assertEqual(
+                head_commit(self.temp_path), "8888888888888888888888888888888888888888"
+            )
+            mock_run.assert_not_called()
+
+    @patch('overphloem.core.git.pygit2', None)
+    @patch('overphloem.core.git.subprocess.run')
+    def test_head_commit_subprocess_fallback(self, mock_run):
+        """Test head_commit falls back to git rev-parse."""
+        mock_run.return_value = MagicMock(
+            stdout="9999999999999999999999999999999999999999\n"
+        )
+
+        self.assertEqual(
+            head_commit(self.temp_path), "9999999999999999999999999999999999999999"
+        )
+        mock_run.assert_called_with(
+            ["git", "--git-dir", str(self.git_dir), "rev-parse", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        # Test case where git is not available
+        mock_run.side_effect = OSError("git not found")
+        self.assertEqual(head_commit(self.temp_path), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
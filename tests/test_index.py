@@ -0,0 +1,82 @@
+"""
+Test file for the FileIndex class.
+"""
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from overphloem.core.index import FileIndex
+
+
+class TestFileIndex(unittest.TestCase):
+    """Test cases for the FileIndex class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.index = FileIndex(self.temp_path / "index.sqlite")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def test_set_get(self):
+        """Test storing and reading a file state."""
+        self.index["main.tex"] = (1, 2, b"digest")
+
+        self.assertIn("main.tex", self.index)
+        self.assertEqual(self.index["main.tex"], (1, 2, b"digest"))
+        self.assertEqual(self.index.get("main.tex"), (1, 2, b"digest"))
+
+        # Replacing a state keeps a single row
+        self.index["main.tex"] = (3, 4, b"other")
+        self.assertEqual(self.index["main.tex"], (3, 4, b"other"))
+        self.assertEqual(len(self.index), 1)
+
+    def test_missing(self):
+        """Test reading a file that is not indexed."""
+        self.assertNotIn("missing.tex", self.index)
+        self.assertIsNone(self.index.get("missing.tex"))
+        with self.assertRaises(KeyError):
+            self.index["missing.tex"]
+
+    def test_update_remove(self):
+        """Test batch update and removal."""
+        self.index.update({"a.tex": (1, 1, b"a"), "b.tex": (2, 2, b"b")})
+        self.index.update([("c.tex", (3, 3, b"c"))])
+        self.assertEqual(self.index.keys(), {"a.tex", "b.tex", "c.tex"})
+
+        self.index.remove(["a.tex", "c.tex"])
+        self.assertEqual(self.index.keys(), {"b.tex"})
+
+        del self.index["b.tex"]
+        self.assertEqual(len(self.index), 0)
+
+    def test_persistence(self):
+        """Test states survive reopening the index."""
+        self.index["main.tex"] = (1, 2, b"digest")
+        self.index.close()
+
+        self.index = FileIndex(self.temp_path / "index.sqlite")
+        self.assertEqual(self.index["main.tex"], (1, 2, b"digest"))
+
+    def test_for_project(self):
+        """Test the project index lives inside the .git directory."""
+        (self.temp_path / ".git").mkdir()
+        project = MagicMock()
+        project.local_path = self.temp_path
+
+        index = FileIndex.for_project(project)
+        try:
+            self.assertEqual(
+                index.path, self.temp_path / ".git" / "overphloem-index.sqlite"
+            )
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,13 +2,16 @@
 Test file for the Project class.
 """
 import os
+import shutil
+import subprocess
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, PropertyMock
 
-from overphloem.core.project import Project
+from overphloem.core.project import Project, _PUSH_PUSH_FAILED, _PUSH_REBASE_FAILED
 from overphloem.core.file import File
+from overphloem.core.git import forget_repository, open_repository, pygit2
 
 
 class TestProject(unittest.TestCase):
@@ -37,7 +40,7 @@ class TestProject(unittest.TestCase):
             with open(full_path, "w") as f:
                 f.write(f"Content of {file_path}")
 
-        self.project = Project(self.project_id, self.temp_path)
+        self.project = Project(self.project_id, self.temp_path, use_pygit2=False)
 
     def tearDown(self):
         """Clean up after tests."""
@@ -104,32 +107,41 @@ class TestProject(unittest.TestCase):
         result = self.project.push()
         self.assertTrue(result)
 
-        # Check that git commands were called
-        mock_run.assert_any_call(
-            ["git", "add", "."],
-            cwd=self.temp_path,
-            check=True,
-            capture_output=True
-        )
-
-        mock_run.assert_any_call(
-            ["git", "commit", "-m", "Update via overphloem"],
-            cwd=self.temp_path,
-            check=True,
-            capture_output=True
-        )
-
-        mock_run.assert_any_call(
-            ["git", "push", "origin", "master"],
+        # Check that all git commands ran in a single shell
+        mock_run.assert_called_once()
+        args, kwargs = mock_run.call_args
+        self.assertEqual(args[0][:2], ["sh", "-c"])
+        self.assertEqual(kwargs["cwd"], self.temp_path)
+        script = args[0][2]
+        self.assertIn("git add .", script)
+        self.assertIn("git commit -m 'Update via overphloem'", script)
+        self.assertIn("git pull --rebase origin master", script)
+        self.assertIn("git push origin master", script)
+
+        # Test case where the rebase fails
+        mock_run.reset_mock()
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(_PUSH_REBASE_FAILED, "sh", stderr="conflict"),
+            MagicMock(returncode=0),
+        ]
+        result = self.project.push()
+        self.assertFalse(result)
+        mock_run.assert_called_with(
+            ["git", "rebase", "--abort"],
             cwd=self.temp_path,
             check=True,
             capture_output=True
         )
 
         # Test case where git push fails
-        mock_run.side_effect = Exception("Git error")
+        mock_run.reset_mock()
+        mock_run.side_effect = subprocess.CalledProcessError(
+            _PUSH_PUSH_FAILED, "sh", stderr="rejected"
+        )
         result = self.project.push()
         self.assertFalse(result)
+        # Only a failed rebase needs aborting
+        mock_run.assert_called_once()
 
     def test_get_file(self):
         """Test get_file method."""
@@ -142,6 +154,27 @@ class TestProject(unittest.TestCase):
         file = self.project.get_file("non_existent.tex")
         self.assertIsNone(file)
 
+        # Test getting a nested file by Path
+        file = self.project.get_file(Path("sections") / "introduction.tex")
+        self.assertIsNotNone(file)
+        self.assertEqual(file.name, "introduction.tex")
+
+        # Test created files are found without reloading
+        new_file = self.project.create_file("sections/new.tex", "New")
+        self.assertIs(self.project.get_file("sections/new.tex"), new_file)
+        self.assertEqual(len(self.project.files), 5)
+
+    def test_files_created_lazily(self):
+        """Test File objects are only created when asked for."""
+        self.project._load_files()
+        self.assertEqual(len(self.project._files), 4)
+        self.assertTrue(all(f is None for f in self.project._files.values()))
+
+        file = self.project.get_file("main.tex")
+        self.assertIs(self.project._files["main.tex"], file)
+        self.assertIs(self.project.get_file("main.tex"), file)
+        self.assertIn(file, self.project.files)
+
     def test_create_file(self):
         """Test create_file method."""
         # Create a new file
@@ -174,6 +207,281 @@ class TestProject(unittest.TestCase):
         result = self.project.delete_file("non_existent.tex")
         self.assertFalse(result)
 
+    def test_batch_write(self):
+        """Test batch_write defers writes until the block exits."""
+        main_file = self.project.get_file("main.tex")
+        intro_file = self.project.get_file("sections/introduction.tex")
+
+        with self.project.batch_write():
+            main_file.content = "First draft"
+            main_file.content = "Second draft"
+            intro_file.content = "New introduction"
+
+            # Nothing is written while the batch is open
+            with open(self.temp_path / "main.tex", "r") as f:
+                self.assertEqual(f.read(), "Content of main.tex")
+
+        with open(self.temp_path / "main.tex", "r") as f:
+            self.assertEqual(f.read(), "Second draft")
+        with open(self.temp_path / "sections/introduction.tex", "r") as f:
+            self.assertEqual(f.read(), "New introduction")
+
+        # Writes are immediate again after the batch
+        self.assertIsNone(self.project._pending_writes)
+        main_file.content = "Final draft"
+        with open(self.temp_path / "main.tex", "r") as f:
+            self.assertEqual(f.read(), "Final draft")
+
+
+class TestProjectGit(unittest.TestCase):
+    """Test cases for Project git operations against a local remote."""
+
+    def setUp(self):
+        """Set up a bare remote with two clones of it."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.remote = self.temp_path / "remote.git"
+        self.work = self.temp_path / "work"
+        self.other = self.temp_path / "other"
+
+        self.git("init", "-q", "--bare", "-b", "master", str(self.remote))
+        self.git("clone", "-q", str(self.remote), str(self.other))
+        self.write(self.other / "main.tex", "hello")
+        self.write(self.other / "intro.tex", "intro")
+        self.commit_and_push("initial")
+        self.git("clone", "-q", str(self.remote), str(self.work))
+        self.git("config", "user.name", "Test", cwd=self.work)
+        self.git("config", "user.email", "test@example.com", cwd=self.work)
+
+        self.project = Project("1234567890abcdef", self.work)
+
+        # Point new clones at the local remote
+        url_patcher = patch.object(
+            Project, "git_url", new_callable=PropertyMock,
+            return_value=self.remote.as_uri()
+        )
+        url_patcher.start()
+        self.addCleanup(url_patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def git(self, *args, cwd=None):
+        """Run a git command for test setup."""
+        subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+    def write(self, path, content):
+        """Write a file."""
+        with open(path, "w") as f:
+            f.write(content)
+
+    def commit_and_push(self, message):
+        """Commit everything in the other clone and push it."""
+        self.git("add", "-A", cwd=self.other)
+        self.git("-c", "user.name=Other", "-c", "user.email=other@example.com",
+                 "commit", "-qm", message, cwd=self.other)
+        self.git("push", "-q", "origin", "master", cwd=self.other)
+
+    def remote_file(self, path):
+        """Read a file from the remote's master branch."""
+        return subprocess.run(
+            ["git", "--git-dir", str(self.remote), "show", f"master:{path}"],
+            capture_output=True, text=True,
+        )
+
+    def test_clone_empty_directory(self):
+        """Test the git fallback clones straight into an empty directory."""
+        path = self.temp_path / "clone"
+        project = Project("1234567890abcdef", path, use_pygit2=False)
+
+        self.assertTrue(project.pull())
+        with open(path / "main.tex") as f:
+            self.assertEqual(f.read(), "hello")
+        self.assertEqual(
+            sorted(str(file.relative_path) for file in project.files),
+            ["intro.tex", "main.tex"],
+        )
+
+    @unittest.skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_clone_shares_repository(self):
+        """Test the in-process clone's handle is reused by later lookups."""
+        path = self.temp_path / "clone"
+        project = Project("1234567890abcdef", path)
+
+        self.assertTrue(project._init_git_repo())
+        self.assertIs(open_repository(path), project._repository())
+
+    @unittest.skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_clone_removed_directory(self):
+        """Test a directory removed and cloned again gets a fresh handle."""
+        path = self.temp_path / "clone"
+        self.addCleanup(forget_repository, path)
+        self.assertTrue(Project("1234567890abcdef", path).pull())
+        repo = open_repository(path)
+
+        # A local file makes the new clone go through git
+        shutil.rmtree(path)
+        path.mkdir()
+        self.write(path / "notes.txt", "notes")
+        project = Project("1234567890abcdef", path)
+        self.assertTrue(project.pull())
+        self.assertIsNot(project._repository(), repo)
+        self.assertEqual(project.get_file("main.tex").content, "hello")
+
+    def test_clone_existing_directory(self):
+        """Test cloning into a non-empty directory keeps local files."""
+        path = self.temp_path / "clone"
+        path.mkdir()
+        self.write(path / "main.tex", "local")
+        self.write(path / "notes.txt", "notes")
+        project = Project("1234567890abcdef", path, use_pygit2=False)
+
+        self.assertTrue(project._init_git_repo())
+        with open(path / "main.tex") as f:
+            self.assertEqual(f.read(), "local")
+        with open(path / "intro.tex") as f:
+            self.assertEqual(f.read(), "intro")
+        self.assertTrue((path / "notes.txt").exists())
+
+    def test_init_git_repo_cached(self):
+        """Test the repository is only probed until it is set up."""
+        self.assertTrue(self.project._init_git_repo())
+
+        with patch.object(Path, "exists") as mock_exists:
+            self.assertTrue(self.project._init_git_repo())
+            mock_exists.assert_not_called()
+
+    def test_clone_failure(self):
+        """Test a failed clone leaves no repository behind."""
+        path = self.temp_path / "clone"
+        path.mkdir()
+        self.write(path / "main.tex", "local")
+        project = Project("1234567890abcdef", path, use_pygit2=False)
+
+        with patch.object(Project, "git_url", new_callable=PropertyMock,
+                          return_value=(self.temp_path / "missing.git").as_uri()):
+            self.assertFalse(project._init_git_repo())
+        self.assertFalse((path / ".git").exists())
+
+    @unittest.skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_pull(self):
+        """Test pull fast-forwards without running git."""
+        self.write(self.other / "main.tex", "hello world")
+        self.commit_and_push("edit")
+
+        with patch('subprocess.run') as mock_run:
+            self.assertTrue(self.project.pull())
+            mock_run.assert_not_called()
+
+        with open(self.work / "main.tex") as f:
+            self.assertEqual(f.read(), "hello world")
+        self.assertEqual(self.project.get_file("main.tex").content, "hello world")
+
+        # Pulling again is a no-op
+        self.assertTrue(self.project.pull())
+
+    def test_pull_up_to_date(self):
+        """Test pull skips fetching when the remote has nothing new."""
+        for use_pygit2 in (False, True):
+            if use_pygit2 and pygit2 is None:
+                continue
+            with self.subTest(use_pygit2=use_pygit2):
+                project = Project("1234567890abcdef", self.work,
+                                  use_pygit2=use_pygit2)
+                run = subprocess.run
+                with patch('subprocess.run', side_effect=run) as mock_run, \
+                        patch.object(Project, "_pull_pygit2") as mock_pull:
+                    self.assertTrue(project.pull())
+                    mock_pull.assert_not_called()
+                    commands = [call.args[0][:2] for call in mock_run.call_args_list]
+                    self.assertNotIn(["git", "pull"], commands)
+
+                # A new remote commit is pulled
+                self.write(self.other / "main.tex", f"edit {use_pygit2}")
+                self.commit_and_push("edit")
+                self.assertTrue(project.pull())
+                with open(self.work / "main.tex") as f:
+                    self.assertEqual(f.read(), f"edit {use_pygit2}")
+
+    @unittest.skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_push(self):
+        """Test push commits additions and deletions without running git."""
+        self.write(self.work / "main.tex", "changed")
+        self.write(self.work / "new.tex", "new")
+        os.remove(self.work / "intro.tex")
+
+        with patch('subprocess.run') as mock_run:
+            self.assertTrue(self.project.push())
+            mock_run.assert_not_called()
+
+        self.assertEqual(self.remote_file("main.tex").stdout, "changed")
+        self.assertEqual(self.remote_file("new.tex").stdout, "new")
+        self.assertNotEqual(self.remote_file("intro.tex").returncode, 0)
+
+    def test_push_diverged(self):
+        """Test push falls back to git when the remote has new commits."""
+        self.write(self.other / "intro.tex", "remote edit")
+        self.commit_and_push("remote edit")
+        self.write(self.work / "main.tex", "local edit")
+
+        self.assertTrue(self.project.push())
+
+        self.assertEqual(self.remote_file("main.tex").stdout, "local edit")
+        self.assertEqual(self.remote_file("intro.tex").stdout, "remote edit")
+
+    def test_push_dirty_paths(self):
+        """Test pushes after the first one stage only the recorded changes."""
+        for use_pygit2 in (False, True):
+            if use_pygit2 and pygit2 is None:
+                continue
+            with self.subTest(use_pygit2=use_pygit2):
+                project = Project("1234567890abcdef", self.work,
+                                  use_pygit2=use_pygit2)
+                project.mark_dirty()
+                self.assertTrue(project.push())
+                self.assertEqual(project._dirty, set())
+
+                project.get_file("main.tex").content = f"edit {use_pygit2}"
+                project.create_file("gone.tex", "gone")
+                project.delete_file("gone.tex")
+                project.delete_file("intro.tex")
+                project.create_file("intro.tex", f"recreated {use_pygit2}")
+                self.assertEqual(project._dirty, {"main.tex", "gone.tex", "intro.tex"})
+
+                self.assertTrue(project.push())
+                self.assertEqual(self.remote_file("main.tex").stdout,
+                                 f"edit {use_pygit2}")
+                self.assertEqual(self.remote_file("intro.tex").stdout,
+                                 f"recreated {use_pygit2}")
+                self.assertNotEqual(self.remote_file("gone.tex").returncode, 0)
+
+    def test_push_external_edit(self):
+        """Test changes made by other means are pushed once marked dirty."""
+        for use_pygit2 in (False, True):
+            if use_pygit2 and pygit2 is None:
+                continue
+            with self.subTest(use_pygit2=use_pygit2):
+                project = Project("1234567890abcdef", self.work,
+                                  use_pygit2=use_pygit2)
+                project.mark_dirty()
+                self.assertTrue(project.push())
+                self.assertEqual(project._dirty, set())
+
+                # Edited and created without going through the project
+                self.write(self.work / "main.tex", f"external {use_pygit2}")
+                self.write(self.work / f"new_{use_pygit2}.tex", "new")
+                project.get_file("intro.tex").content = f"intro {use_pygit2}"
+                project.mark_dirty()
+
+                self.assertTrue(project.push())
+                self.assertEqual(self.remote_file("main.tex").stdout,
+                                 f"external {use_pygit2}")
+                self.assertEqual(self.remote_file(f"new_{use_pygit2}.tex").stdout,
+                                 "new")
+                self.assertEqual(self.remote_file("intro.tex").stdout,
+                                 f"intro {use_pygit2}")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -12,7 +12,8 @@ from overphloem.utils.utils import (
     validate_project_id,
     find_tex_files,
     extract_tex_commands,
-    get_bibtex_entries
+    get_bibtex_entries,
+    walk_files,
 )
 
 
@@ -57,7 +58,8 @@ class TestUtils(unittest.TestCase):
             "sections/introduction.tex",
             "sections/conclusion.tex",
             "figures/figure1.png",
-            "references.bib"
+            "references.bib",
+            ".git/ignored.tex"
         ]
 
         for file_path in test_files:
@@ -75,6 +77,52 @@ class TestUtils(unittest.TestCase):
         self.assertIn(self.temp_path / "sections/introduction.tex", tex_files)
         self.assertIn(self.temp_path / "sections/conclusion.tex", tex_files)
 
+    def test_walk_files(self):
+        """Test walk_files function."""
+        test_files = [
+            "main.tex",
+            "sections/introduction.tex",
+            "figures/figure1.png",
+            "build/main.aux",
+            ".git/HEAD",
+            ".git/refs/heads/master",
+        ]
+
+        for file_path in test_files:
+            full_path = self.temp_path / file_path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(full_path, "w") as f:
+                f.write(f"Content of {file_path}")
+
+        # Symbolic links to files are listed, to directories not followed
+        os.symlink(self.temp_path / "main.tex", self.temp_path / "link.tex")
+        os.symlink(self.temp_path / "sections", self.temp_path / "linked")
+        os.symlink(self.temp_path / "missing.tex", self.temp_path / "broken.tex")
+
+        def walked(**kwargs):
+            return sorted(
+                os.path.relpath(entry.path, self.temp_path)
+                for entry in walk_files(self.temp_path, **kwargs)
+            )
+
+        # The .git directory is skipped by default
+        self.assertEqual(walked(), [
+            "build/main.aux",
+            "figures/figure1.png",
+            "link.tex",
+            "main.tex",
+            "sections/introduction.tex",
+        ])
+
+        # Ignore patterns apply to both files and directories
+        self.assertEqual(
+            walked(ignore=[".git", "build", "*.png", "link.*"]),
+            ["main.tex", "sections/introduction.tex"],
+        )
+
+        # No patterns walks everything
+        self.assertEqual(len(walked(ignore=[])), 7)
+
     def test_extract_tex_commands(self):
         """Test extract_tex_commands function."""
         # Create test TeX content
@@ -116,6 +164,12 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(citations, ["reference1", "reference2"])
         self.assertEqual(includes, ["figure1.png"])
 
+        # Command names are matched literally
+        self.assertEqual(
+            extract_tex_commands(r"\section*{Preface} \section{Intro}", "section*"),
+            ["Preface"],
+        )
+
     def test_get_bibtex_entries(self):
         """Test get_bibtex_entries function."""
         # Create test BibTeX content
@@ -161,6 +215,33 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(entries["reference2"]["publisher"], "Test Publisher")
         self.assertEqual(entries["reference2"]["year"], "2022")
 
+        # Quoted, bare and nested-brace values, all on one line
+        entries = get_bibtex_entries(
+            '@misc{ref3, Title = {The {LaTeX} Companion}, note = "Draft", year = 2021}'
+        )
+        self.assertEqual(entries["ref3"]["title"], "The {LaTeX} Companion")
+        self.assertEqual(entries["ref3"]["note"], "Draft")
+        self.assertEqual(entries["ref3"]["year"], "2021")
+
+        # Braces nested more than one level deep
+        entries = get_bibtex_entries(
+            '@misc{ref4, title = {A {B {C}} D}, year = {2020}}'
+        )
+        self.assertEqual(entries["ref4"]["title"], "A {B {C}} D")
+        self.assertEqual(entries["ref4"]["year"], "2020")
+
+        # Strings, comments and free text between entries are not fields
+        entries = get_bibtex_entries(r"""
+        @article{ref5, title = {Five}}
+        @string{jt = "Journal of Testing"}
+        % note = unused
+        Some free text with x = y in it.
+        @comment{ignored = {entirely}}
+        @book{ref6, title = "Six"}
+        """)
+        self.assertEqual(entries["ref5"], {"type": "article", "title": "Five"})
+        self.assertEqual(entries["ref6"], {"type": "book", "title": "Six"})
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file